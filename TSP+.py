@@ -23,89 +23,109 @@ who have to cover different parts of the journey.
 
 ### 4 The route must minimize the total distance, respect the capacity and visit each city within its time window.
 
+### 5 The route starts from city 0, where the salesperson loads the goods:
+      the load carried since the last supply point, and the time taken 
+      to travel from city to city, accumulate along the route.
+
 
                           ### Idea ###
                           
 I define a simplified version with a matrix of distances between 
 cities, using variables to represent the sequence of cities visited.
 
+Before encoding, the arcs (a, b) that no route can use are removed: 
+those that reach b after its time window closes even leaving a as 
+early as possible, and those that would carry the demands of a and b 
+together beyond the capacity. Only the remaining arcs are encoded.
+The shrink is measured on the arcs themselves: the live pairs (a, b)
+out of the n(n-1) pairs of distinct cities, whatever the encoding.
+
+With multiple salespeople the customers are first assigned to the 
+salespeople, then the route of each one is solved in parallel.
+
+The solver lives in tspPlus.py, so that it can be imported (TSP+.py is
+not a valid module name): from tspPlus import solve_tsp_plus.
+
 """""
 
-from z3 import *
-
-# Distances between 5 cities, defined in a symmetric matrix
-distances = [
-    [0, 10, 15, 20, 25],
-    [10, 0, 35, 25, 30],
-    [15, 35, 0, 30, 20],
-    [20, 25, 30, 0, 15],
-    [25, 30, 20, 15, 0]
-]
-
-# Number of nodes
-n_city = len(distances)
-
-# Maximum salesperson capacity and resource requirements for each city
-capacity = 40
-demands = [0, 10, 15, 20, 10]  # The first city (0) has request zero
-
-# Time window for each city (min and max "time" to spend)
-time_windows = [(0, 10), (2, 6), (3, 8), (1, 7), (4, 9)]
-
-# Let's make the optimizer
-opt = Optimize()
-
-# Variables: each city occupies a position in the route and a visit time
-city = [Int(f'city_{i}') for i in range(n_city)]
-visit_time = [Int(f'visit_time_{i}') for i in range(n_city)]
-
-# Constraints on the location and distinction of cities in the route
-opt.add([And(city[i] >= 0, city[i] < n_city) for i in range(n_city)])
-opt.add(Distinct(city))
-
-# Capacity constraints: the clerk must not exceed the capacity carried
-load_vars = []
-for i in range(n_city):
-    load_var = Int(f'load_{i}')
-    load_vars.append(load_var)
-    # Cumulative load up to each city
-    opt.add(load_var == Sum([If(city[j] == i, demands[j], 0) for j in range(n_city)]))
-    opt.add(load_var <= capacity)  # Capacity constraint
-
-# Time window constraints: each city must be visited within its range
-for i in range(n_city):
-    min_time, max_time = time_windows[i]
-    opt.add(visit_time[i] >= min_time)
-    opt.add(visit_time[i] <= max_time)
-
-# Objective function: total distance calculated with additional constraints
-distance_vars = []
-for i in range(n_city):
-    dist = Int(f'dist_{i}')
-    distance_vars.append(dist)
-    opt.add(Or([And(city[i] == a, city[(i + 1) % n_city] == b, dist == distances[a][b])
-                for a in range(n_city) for b in range(n_city)]))
-
-# Minimization of total distance
-total_distance = Sum(distance_vars)
-opt.minimize(total_distance)
-
-# Let's find the solution
-if opt.check() == sat:
-    model = opt.model()
-
-    # Variable evaluation to obtain the optimal path, time, load in integers
-    path = [model.evaluate(city[i]).as_long() for i in range(n_city)]
-    times = [model.evaluate(visit_time[i]).as_long() for i in range(n_city)]
-    load_vals = [model.evaluate(load_vars[i]).as_long() for i in range(n_city)]
-    # Total distance calculation
-    calc_distance = sum(distances[path[i]][path[(i + 1) % n_city]]
-                        for i in range(n_city))
-
-    print("Shortest route:", path) # Shortest route: [1, 3, 4, 2, 0]
-    print("Time windows:", times) # Time windows: [0, 2, 3, 1, 4]
-    print("Transported cargo:", load_vals) # Transported cargo: [10, 0, 20, 10, 15]
-    print("Total distance:", calc_distance) # Total distance: 85
-
-else:
-    print("No solution found!")
+import argparse
+import sys
+
+from tspPlus import route, solve_stream, vrp
+
+
+# Example usage
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # Batch mode: python "TSP+.py" instances.jsonl [-o results.jsonl] [--workers N]
+    parser = argparse.ArgumentParser(description="Solve TSP+ instances read as JSON lines.")
+    parser.add_argument("instances", help="JSON-lines file of instances, - for standard input")
+    parser.add_argument("-o", "--output", default="-", help="JSON-lines file of results, - for standard output")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU, 0: solve in this process)")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.instances == "-" else open(args.instances)
+    target = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        solve_stream(source, target, args.workers)
+    finally:
+        # Only the files opened here are closed, never the standard streams
+        for stream in (source, target):
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+
+elif __name__ == "__main__":
+    # Distances between 5 cities, defined in a symmetric matrix
+    distances = [
+        [0, 10, 15, 20, 25],
+        [10, 0, 35, 25, 30],
+        [15, 35, 0, 30, 20],
+        [20, 25, 30, 0, 15],
+        [25, 30, 20, 15, 0]
+    ]
+
+    # Maximum salesperson capacity and resource requirements for each city
+    capacity = 40
+    demands = [0, 10, 15, 20, 10]  # The first city (0) has request zero
+
+    # Cities where the salesperson recharges the capacity (the depot 0 is always one)
+    supply_points = [0, 2]
+
+    # Time window for each city (min and max "time" to spend)
+    time_windows = [(0, 10), (2, 6), (3, 8), (1, 7), (4, 9)]
+
+    # Time needed to travel between cities
+    travel_times = [[d // 10 for d in row] for row in distances]
+
+    # One salesperson visiting every city
+    result = route([1, 2, 3, 4], distances, demands, time_windows, travel_times, capacity, supply_points,
+                   verbose=True)
+    if result:
+        path, times, loads, calc_distance = result
+        print("Shortest route:", path) # Shortest route: [0, 1, 3, 4, 2]
+        print("Time windows:", [times[c] for c in sorted(times)]) # Time windows: [0, 2, 8, 4, 6]
+        print("Transported cargo:", [loads[c] for c in sorted(loads)]) # Transported cargo: [0, 10, 15, 30, 40]
+        print("Total distance:", calc_distance) # Total distance: 85
+    else:
+        print("No solution found!")
+
+    # Staggered delivery slots: the arcs that arrive after a slot has closed are never encoded
+    slots = [(0, 20), (1, 3), (4, 6), (7, 9), (10, 12)]
+    result = route([1, 2, 3, 4], distances, demands, slots, travel_times, capacity, [0, 3],
+                   verbose=True) # Live arcs (a, b): 14 of 20 (30% pruned)
+    if result:
+        path, times, loads, calc_distance = result
+        print("Route within the slots:", path) # Route within the slots: [0, 1, 2, 3, 4]
+        print("Total distance:", calc_distance) # Total distance: 115
+    else:
+        print("No solution found!")
+
+    # Two salespeople sharing the cities, recharging only at the depot
+    solution = vrp(2, distances, demands, time_windows, travel_times, capacity)
+    if solution:
+        routes, calc_distance = solution
+        for v, (path, times, loads, _) in enumerate(routes):
+            print(f"Salesperson {v} route:", path)
+        print("Total distance:", calc_distance)
+    else:
+        print("No solution found!")
@@ -21,29 +21,44 @@ of departure.
 I define a simplified version with a matrix of distances between 
 cities, using variables to represent the sequence of cities visited.
 
+Each leg of the tour can be tied to the matrix in two ways: with a 
+disjunction over every pair of cities (n² terms per leg), or with 
+the matrix defined once as a lookup table dist(a, b) (one term per leg).
+
+The "successor" engine models the tour differently: every city 
+chooses the next city to visit, and MTZ ordering variables rule out 
+subtours, so each leg reads its distance from a single row of the matrix.
+The benchmark in tspTime.py compares the encodings.
+
+The solver does not start from nothing: a nearest neighbour tour 
+improved by 2-opt gives a first upper bound, which is then tightened 
+step by step until it meets the lower bound or the time runs out.
+
+Large instances are split into groups of close cities solved in 
+parallel processes (tsp_large), then stitched and repaired with 2-opt.
+
 """""
 
+from concurrent.futures import ProcessPoolExecutor
 from z3 import *
+import heapq
+import math
+import time
 
-def tsp(cities, distances):
-    """
-    Solves the Traveling Salesman Problem (TSP) for a set of cities and a distance matrix using Z3 arrays.
+from tspBound import held_karp_bound
 
-    Args:
-        cities (list): A list of city names.
-        distances (list of lists): A matrix representing distances between cities.
+# Available ways of modelling the tour and tying each leg to the distance matrix
+ENCODINGS = ("disjunction", "lookup", "successor")
 
-    Returns:
-        tuple: A sequence of cities representing the shortest path and its total distance if a solution exists.
-        None: If no solution is found.
-    """
-    
-    # Number of cities
-    n_city = len(cities)
 
-    # Create an optimization solver
-    opt = Optimize()
+def _encode_permutation(opt, n_city, distances, encoding):
+    """
+    Models the tour as a permutation array path[position] = city.
 
+    Returns:
+        tuple: Functions reading a tour from a model and suggesting a tour to the solver,
+        and the total distance expression.
+    """
     # Define a symbolic array to represent the sequence of cities in the path
     path = Array('path', IntSort(), IntSort())
 
@@ -64,32 +79,636 @@ def tsp(cities, distances):
 
     # Define variables to store the distances between consecutive cities in the path
     distance_vars = [Int(f'dist_{i}') for i in range(n_city)]
+    if encoding == "disjunction":
+        for i in range(n_city):
+            # Add constraints to associate distance variables with the distances in the matrix
+            opt.add(Or([
+                And(path[i] == a, path[(i + 1) % n_city] == b, distance_vars[i] == distances[a][b])
+                for a in range(n_city) for b in range(n_city)
+            ]))
+    else:
+        # The distance matrix is defined once as a lookup table dist(a, b)
+        dist = Function('dist', IntSort(), IntSort(), IntSort())
+        for a in range(n_city):
+            for b in range(n_city):
+                opt.add(dist(a, b) == distances[a][b])
+        for i in range(n_city):
+            # Keep the lookup inside the table and read each leg with a single term
+            opt.add(And(path[i] >= 0, path[i] < n_city))
+            opt.add(distance_vars[i] == dist(path[i], path[(i + 1) % n_city]))
+
+    def read_path(model):
+        # Extract the path by evaluating the symbolic array
+        return [model.evaluate(path[i]).as_long() for i in range(n_city)]
+
+    def hint_path(solver, tour):
+        # Suggest a known tour as the first values the solver tries
+        for i, city in enumerate(tour):
+            solver.set_initial_value(path[i], city)
+
+    return read_path, hint_path, Sum(distance_vars)
+
+
+def _successor_tour(opt, n_city):
+    """
+    Models the tour as one "next city" choice per city, with MTZ ordering
+    variables (Miller-Tucker-Zemlin) ruling out subtours.
+
+    Returns:
+        tuple: The next city variables, and functions reading a tour from a model
+        and suggesting a tour to the solver.
+    """
+    # next_city[i] is the city visited right after city i
+    next_city = [Int(f'next_{i}') for i in range(n_city)]
+    # order[i] is the position of city i in the tour, the tour starts from city 0
+    order = [Int(f'order_{i}') for i in range(n_city)]
+
+    # Constraint (1): Each city is left once and entered once
+    for i in range(n_city):
+        opt.add(And(next_city[i] >= 0, next_city[i] < n_city, next_city[i] != i))
+    opt.add(Distinct(next_city))
+
+    # Constraint (2): The successors form a single cycle through city 0
+    opt.add(order[0] == 0)
+    for i in range(1, n_city):
+        opt.add(And(order[i] >= 1, order[i] < n_city))
     for i in range(n_city):
-        # Add constraints to associate distance variables with the distances in the matrix
-        opt.add(Or([
-            And(path[i] == a, path[(i + 1) % n_city] == b, distance_vars[i] == distances[a][b])
-            for a in range(n_city) for b in range(n_city)
-        ]))
+        for j in range(1, n_city):
+            if i != j:
+                # Moving to a city other than 0 always moves forward in the tour
+                opt.add(Implies(next_city[i] == j, order[j] >= order[i] + 1))
+
+    def read_path(model):
+        # Follow the successors starting from city 0
+        successors = [model.evaluate(next_city[i]).as_long() for i in range(n_city)]
+        path_eval = [0]
+        while len(path_eval) < n_city:
+            path_eval.append(successors[path_eval[-1]])
+        return path_eval
+
+    def hint_path(solver, tour):
+        # Suggest a known tour as the first values the solver tries
+        for i, city in enumerate(tour):
+            solver.set_initial_value(next_city[city], tour[(i + 1) % n_city])
+            solver.set_initial_value(order[city], i)
+
+    return next_city, read_path, hint_path
+
+
+def _successor_leg(next_city, i, row):
+    """Distance of the leg leaving city i, read from its row of the matrix."""
+    others = [j for j in range(len(row)) if j != i]
+    leg = IntVal(row[others[-1]])
+    for j in others[:-1]:
+        leg = If(next_city[i] == j, row[j], leg)
+    return leg
+
+
+def _encode_successor(opt, n_city, distances):
+    """
+    Models the tour with successor variables, each leg reading its distance
+    straight from the row of the departing city.
+
+    Returns:
+        tuple: Functions reading a tour from a model and suggesting a tour to the solver,
+        and the total distance expression.
+    """
+    next_city, read_path, hint_path = _successor_tour(opt, n_city)
+    distance_vars = [_successor_leg(next_city, i, distances[i]) for i in range(n_city)]
+    return read_path, hint_path, Sum(distance_vars)
+
+
+def _encode(solver, n_city, distances, encoding):
+    """Adds the tour constraints of the chosen encoding to a solver or optimizer."""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS}")
+    if encoding == "successor":
+        return _encode_successor(solver, n_city, distances)
+    return _encode_permutation(solver, n_city, distances, encoding)
+
+
+def build_model(n_city, distances, encoding="disjunction"):
+    """
+    Builds the TSP optimization model without solving it.
+
+    Args:
+        n_city (int): Number of cities.
+        distances (list of lists): A matrix representing distances between cities.
+        encoding (str): "disjunction" ties every leg to the matrix with an Or over all
+            the n² city pairs, "lookup" defines the matrix once as a function dist(a, b)
+            so that every leg costs a single term, "successor" chooses the next city of
+            every city and reads each leg from the row of the matrix of that city.
+
+    Returns:
+        tuple: The optimizer, a function reading the tour from a model and the total distance expression.
+    """
+    # Create an optimization solver
+    opt = Optimize()
+    read_path, _, total_distance = _encode(opt, n_city, distances, encoding)
 
     # Objective function: Minimize the total distance of the path
-    total_distance = Sum(distance_vars)
     opt.minimize(total_distance)
 
-    # Solve the problem
-    if opt.check() == sat:
-        # If a solution exists, retrieve the model
-        model = opt.model()
+    return opt, read_path, total_distance
 
-        # Extract the path by evaluating the symbolic array
-        path_eval = [model.evaluate(path[i]).as_long() for i in range(n_city)]
 
-        # Calculate the total distance based on the solution
-        calc_distance = sum(distances[path_eval[i]][path_eval[(i + 1) % n_city]] for i in range(n_city))
+def tour_length(path, distances):
+    """Total distance of a closed tour."""
+    n_city = len(path)
+    return sum(distances[path[i]][path[(i + 1) % n_city]] for i in range(n_city))
 
-        return path_eval, calc_distance
-    else:
-        # Return None if no solution is found
-        return None, None
+
+def nearest_neighbour(distances, start=0):
+    """
+    Builds a tour by always moving to the closest city not visited yet.
+
+    Args:
+        distances (list of lists): A matrix representing distances between cities.
+        start (int): City the tour starts from.
+
+    Returns:
+        list: A sequence of cities visiting every city once.
+    """
+    to_visit = set(range(len(distances))) - {start}
+    path = [start]
+    while to_visit:
+        row = distances[path[-1]]
+        city = min(to_visit, key=lambda j: row[j])
+        to_visit.remove(city)
+        path.append(city)
+    return path
+
+
+def two_opt(path, distances, deadline=None):
+    """
+    Improves a tour by reversing segments as long as a reversal shortens it.
+    On an asymmetric matrix the legs inside the reversed segment change direction,
+    and their change of length counts too.
+
+    Args:
+        path (list): A sequence of cities visiting every city once.
+        distances (list of lists): A matrix representing distances between cities.
+        deadline (float): Optional time.monotonic() value after which the search stops.
+
+    Returns:
+        list: A tour at most as long as the given one.
+    """
+    path = list(path)
+    n_city = len(path)
+    symmetric = all(distances[a][b] == distances[b][a] for a in range(n_city) for b in range(a))
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n_city - 1):
+            if deadline is not None and time.monotonic() > deadline:
+                return path
+            a, b = path[i], path[i + 1]
+            reversal = 0  # Change of length of the legs inside path[i + 1:j + 1] once reversed
+            for j in range(i + 2, n_city if i > 0 else n_city - 1):
+                c, d = path[j], path[(j + 1) % n_city]
+                if not symmetric:
+                    reversal += distances[c][path[j - 1]] - distances[path[j - 1]][c]
+                # Replace legs a-b and c-d with a-c and b-d
+                delta = distances[a][c] + distances[b][d] - distances[a][b] - distances[c][d] + reversal
+                if delta < 0:
+                    path[i + 1:j + 1] = reversed(path[i + 1:j + 1])
+                    a, b = path[i], path[i + 1]
+                    improved = True
+                    if not symmetric:
+                        # The legs after j were summed over the old order
+                        break
+    return path
+
+
+def _shorter(path, other, distances):
+    """The shorter of two tours, path on ties."""
+    return path if tour_length(path, distances) <= tour_length(other, distances) else other
+
+
+def row_minimum_bound(distances):
+    """Lower bound on any tour: every city is left once, at least along its shortest leg."""
+    n_city = len(distances)
+    return sum(min(distances[i][j] for j in range(n_city) if j != i) for i in range(n_city))
+
+
+def tsp_anytime(cities, distances, encoding="successor", timeout_ms=None):
+    """
+    Solves the TSP by improving a heuristic tour until it is proven optimal or time runs out.
+
+    The nearest neighbour tour, improved by 2-opt, gives the first upper bound
+    and the Held-Karp relaxation (tspBound.py) the first lower bound. The solver
+    is then asked for tours below a target between the lower and the
+    upper bound: a tour found lowers the upper bound, a proof that none exists
+    raises the lower bound.
+
+    Args:
+        cities (list): A list of city names.
+        distances (list of lists): A matrix representing distances between cities.
+        encoding (str): How the tour is modelled, see build_model().
+        timeout_ms (int): Optional wall-clock budget in milliseconds.
+
+    Yields:
+        tuple: The best tour so far, its total distance and the best known lower bound,
+        every time one of them improves. The tour is optimal when the two are equal.
+    """
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    n_city = len(cities)
+
+    # Heuristic warm start: the first tour costs no solver time
+    best_path = two_opt(nearest_neighbour(distances), distances, deadline)
+    best_distance = tour_length(best_path, distances)
+    # Held-Karp bound: often proves the heuristic tour optimal without calling the solver
+    lower_bound = 0
+    if n_city > 1:
+        lower_bound = max(row_minimum_bound(distances),
+                          held_karp_bound(distances, best_distance, deadline=deadline))
+        lower_bound = min(lower_bound, best_distance)
+    yield best_path, best_distance, lower_bound
+    if lower_bound >= best_distance or deadline is not None and time.monotonic() > deadline:
+        # Proven optimal, or no time left to build the model
+        return
+
+    solver = Solver()
+    read_path, hint_path, total_distance = _encode(solver, n_city, distances, encoding)
+    yield from _tighten(solver, read_path, hint_path, total_distance, distances,
+                        best_path, lower_bound, deadline)
+
+
+def _tighten(solver, read_path, hint_path, total_distance, distances, best_path, lower_bound,
+             deadline, assumptions=()):
+    """
+    Asks the solver for tours between the bounds, yielding every improvement.
+
+    Bounds only hold for the current distances, so they are asserted behind
+    literals that are passed as assumptions together with the given ones:
+    a long lived solver can forget them once the distances change.
+    """
+    best_distance = tour_length(best_path, distances)
+    hint_path(solver, best_path)
+
+    def prove(bound):
+        proven = FreshBool('proven')
+        solver.add(Implies(proven, total_distance >= bound))
+        return [proven]
+
+    assumptions = list(assumptions) + prove(lower_bound)
+
+    # Bisect between the bounds until a probe times out, then tighten one step at a time
+    bisect = True
+    while lower_bound < best_distance:
+        probe_timeout = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            probe_timeout = remaining / 2 if bisect else remaining
+        solver.set("timeout", 4294967295 if probe_timeout is None else max(1, int(probe_timeout * 1000)))
+
+        target = (lower_bound + best_distance - 1) // 2 if bisect else best_distance - 1
+        below_target = Bool(f'below_{target}')
+        solver.add(Implies(below_target, total_distance <= target))
+        result = solver.check(*assumptions, below_target)
+
+        if result == sat:
+            path = read_path(solver.model())
+            path = _shorter(two_opt(path, distances, deadline), path, distances)
+            if tour_length(path, distances) >= best_distance:
+                # Only a shorter tour may replace the incumbent
+                break
+            best_path, best_distance = path, tour_length(path, distances)
+            hint_path(solver, best_path)
+        elif result == unsat:
+            # No tour is that short: the lower bound is proven
+            lower_bound = target + 1
+            assumptions += prove(lower_bound)
+        elif bisect:
+            bisect = False
+            continue
+        else:
+            break
+        yield best_path, best_distance, lower_bound
+
+
+def tsp(cities, distances, encoding="disjunction", timeout_ms=None, callback=None, return_bound=False):
+    """
+    Solves the Traveling Salesman Problem (TSP) for a set of cities and a distance matrix using Z3.
+
+    Args:
+        cities (list): A list of city names.
+        distances (list of lists): A matrix representing distances between cities.
+        encoding (str): How the tour is modelled, see build_model().
+        timeout_ms (int): Optional wall-clock budget in milliseconds, the best tour
+            found in time is returned.
+        callback (callable): Optional function called as callback(path, distance, lower_bound)
+            every time a better tour or a better lower bound is found.
+        return_bound (bool): Also return the best lower bound, equal to the distance
+            when the path is proven optimal.
+
+    Returns:
+        tuple: A sequence of cities representing the shortest path found and its total distance
+        (and its lower bound if return_bound is set).
+        None: If there are no cities.
+    """
+    
+    # Number of cities
+    n_city = len(cities)
+    if n_city == 0:
+        return (None, None, None) if return_bound else (None, None)
+
+    for path, total_distance, lower_bound in tsp_anytime(cities, distances, encoding, timeout_ms):
+        if callback is not None:
+            callback(path, total_distance, lower_bound)
+    if return_bound:
+        return path, total_distance, lower_bound
+    return path, total_distance
+
+
+class TSPSession:
+    """
+    Keeps a TSP model alive while the distance matrix changes a few entries at a time.
+
+    The tour is modelled with successor variables. The leg leaving every city is
+    defined behind a literal passed to the solver as an assumption: when a row of
+    the matrix changes only that leg is encoded again under a new literal, and the
+    old one is no longer assumed. Clauses learned on the rest of the model are kept,
+    and every solve starts from the previous tour.
+
+    The rows no longer assumed stay in the solver, so once they outnumber the cities
+    the solver is built again from the current matrix: its size stays within about
+    twice that of a fresh model.
+    """
+
+    def __init__(self, cities, distances):
+        """
+        Args:
+            cities (list): A list of city names.
+            distances (list of lists): A matrix representing distances between cities.
+        """
+        self.cities = cities
+        self.distances = [list(row) for row in distances]
+        self.n_city = len(cities)
+        self.path = None
+        self._build()
+
+    def _build(self):
+        """Builds the solver with every row of the current matrix."""
+        self.solver = Solver()
+        self._next_city, self._read_path, self._hint_path = _successor_tour(self.solver, self.n_city)
+        self._legs = [Int(f'leg_{i}') for i in range(self.n_city)]
+        self._total_distance = Sum(self._legs)
+        self._row_literals = [self._encode_row(i) for i in range(self.n_city)]
+        self._dead_rows = 0  # Rows no longer assumed whose definitions are still in the solver
+
+    def _encode_row(self, i):
+        """Defines the leg leaving city i behind a new literal."""
+        literal = FreshBool(f'row_{i}')
+        self.solver.add(Implies(literal, self._legs[i] == _successor_leg(self._next_city, i, self.distances[i])))
+        return literal
+
+    def update(self, changes):
+        """
+        Changes some entries of the distance matrix.
+
+        Args:
+            changes (dict): New distances keyed by (from_city, to_city).
+        """
+        rows = set()
+        for (a, b), distance in changes.items():
+            self.distances[a][b] = distance
+            rows.add(a)
+        self._dead_rows += len(rows)
+        if self._dead_rows > self.n_city:
+            self._build()
+            return
+        for i in rows:
+            self._row_literals[i] = self._encode_row(i)
+
+    def solve(self, timeout_ms=None, callback=None):
+        """
+        Solves the TSP for the current distances, starting from the previous tour.
+
+        Args:
+            timeout_ms (int): Optional wall-clock budget in milliseconds.
+            callback (callable): Optional function called as callback(path, distance, lower_bound)
+                every time a better tour or a better lower bound is found.
+
+        Returns:
+            tuple: A sequence of cities representing the shortest path found and its total distance.
+        """
+        deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+        if self.n_city < 3:
+            self.path = list(range(self.n_city))
+            return self.path, tour_length(self.path, self.distances)
+
+        # Warm start: the previous tour, repaired for the new distances
+        start = self.path or nearest_neighbour(self.distances)
+        best_path = two_opt(start, self.distances, deadline)
+        best_distance = tour_length(best_path, self.distances)
+        lower_bound = min(best_distance, max(row_minimum_bound(self.distances),
+                                             held_karp_bound(self.distances, best_distance, deadline=deadline)))
+
+        if callback is not None:
+            callback(best_path, best_distance, lower_bound)
+        if lower_bound < best_distance:
+            for best_path, best_distance, lower_bound in _tighten(
+                    self.solver, self._read_path, self._hint_path, self._total_distance, self.distances,
+                    best_path, lower_bound, deadline, assumptions=self._row_literals):
+                if callback is not None:
+                    callback(best_path, best_distance, lower_bound)
+
+        self.path = best_path
+        return best_path, best_distance
+
+
+def cluster_cities(distances, cluster_size, rounds=5):
+    """
+    Splits the cities into groups of close cities of at most cluster_size each.
+
+    The group centres are spread out by farthest point sampling, then every city
+    joins the closest centre that still has room, closest cities first, and the
+    centres are moved to the medoid of their group.
+
+    Args:
+        distances (list of lists): A matrix representing distances between cities.
+        cluster_size (int): Maximum number of cities in a group.
+        rounds (int): Number of times the centres are moved to the middle of their group.
+
+    Returns:
+        list of lists: The cities of every group, the first one being its centre.
+    """
+    n_city = len(distances)
+    n_cluster = math.ceil(n_city / cluster_size)
+
+    # Farthest point sampling of the centres
+    centres = [0]
+    gap = list(distances[0])
+    while len(centres) < n_cluster:
+        centre = max(range(n_city), key=gap.__getitem__)
+        centres.append(centre)
+        gap = [min(gap[j], distances[centre][j]) for j in range(n_city)]
+
+    # A few rounds of k-medoids: assign, then move every centre to the middle of its group
+    for _ in range(rounds):
+        clusters = [[centre] for centre in centres]
+        is_centre = set(centres)
+        nearest = [min(distances[c][j] for c in centres) for j in range(n_city)]
+        others = sorted((j for j in range(n_city) if j not in is_centre), key=nearest.__getitem__)
+        for city in others:
+            open_clusters = [k for k in range(n_cluster) if len(clusters[k]) < cluster_size]
+            k = min(open_clusters, key=lambda k: distances[centres[k]][city])
+            clusters[k].append(city)
+        centres = [min(group, key=lambda a: sum(distances[a][b] for b in group)) for group in clusters]
+    return [[centre] + [city for city in group if city != centre] for centre, group in zip(centres, clusters)]
+
+
+def _solve_cluster(sub_distances, timeout_ms):
+    """Worker: solves the tour of one group in its own process (and Z3 context)."""
+    path, _ = tsp(list(range(len(sub_distances))), sub_distances, "successor", timeout_ms)
+    return path
+
+
+def local_repair(path, distances, neighbours=8, deadline=None):
+    """
+    2-opt and Or-opt restricted to the closest cities of every city, fast enough
+    for thousands of cities. Used to repair the legs where groups are stitched.
+
+    Args:
+        path (list): A sequence of cities visiting every city once.
+        distances (list of lists): A matrix representing distances between cities.
+        neighbours (int): Number of closest cities tried for every city.
+        deadline (float): Optional time.monotonic() value after which the repair stops.
+
+    Returns:
+        list: A tour at most as long as the given one.
+    """
+    path = list(path)
+    n_city = len(path)
+    closest = [heapq.nsmallest(neighbours + 1, range(n_city), key=row.__getitem__) for row in distances]
+    position = [0] * n_city
+    for i, city in enumerate(path):
+        position[city] = i
+
+    length_before = tour_length(path, distances)
+    improved = True
+    while improved:
+        start_path = list(path)
+
+        # 2-opt: replace legs a-b and c-d with a-c and b-d
+        for i in range(n_city):
+            if deadline is not None and time.monotonic() > deadline:
+                return _shorter(path, start_path, distances)
+            a, b = path[i], path[(i + 1) % n_city]
+            for c in closest[a]:
+                j = position[c]
+                d = path[(j + 1) % n_city]
+                if c == a or c == b or d == a:
+                    continue
+                delta = distances[a][c] + distances[b][d] - distances[a][b] - distances[c][d]
+                if delta < 0:
+                    lo, hi = (i + 1, j) if i < j else (j + 1, i)
+                    path[lo:hi + 1] = reversed(path[lo:hi + 1])
+                    for k in range(lo, hi + 1):
+                        position[path[k]] = k
+                    a, b = path[i], path[(i + 1) % n_city]
+
+        # Or-opt: move a segment of up to three cities next to one of its closest cities
+        for length in (1, 2, 3):
+            i = 0
+            while i < n_city - length:
+                if deadline is not None and time.monotonic() > deadline:
+                    return _shorter(path, start_path, distances)
+                segment = path[i:i + length]
+                p, q = path[i - 1], path[(i + length) % n_city]
+                gain = distances[p][segment[0]] + distances[segment[-1]][q] - distances[p][q]
+                best = None
+                for c in closest[segment[0]] + closest[segment[-1]]:
+                    j = position[c]
+                    e = path[(j + 1) % n_city]
+                    # Inside the segment or its own predecessor (path[-1] when i is 0): no move
+                    if i - 1 <= j < i + length or j == (i - 1) % n_city:
+                        continue
+                    forward = distances[c][segment[0]] + distances[segment[-1]][e] - distances[c][e]
+                    backward = distances[c][segment[-1]] + distances[segment[0]][e] - distances[c][e]
+                    for cost, reverse in ((forward, False), (backward, True)):
+                        if cost < gain and (best is None or cost < best[0]):
+                            best = (cost, c, reverse)
+                if best is None:
+                    i += 1
+                    continue
+                _, c, reverse = best
+                del path[i:i + length]
+                j = path.index(c)
+                path[j + 1:j + 1] = segment[::-1] if reverse else segment
+                for k, city in enumerate(path):
+                    position[city] = k
+
+        # Another round only if this one made the tour strictly shorter
+        length_after = tour_length(path, distances)
+        improved = length_after < length_before
+        if not improved:
+            path = start_path
+        length_before = min(length_before, length_after)
+    return path
+
+
+def tsp_large(cities, distances, cluster_size=15, workers=None, cluster_timeout_ms=5000, timeout_ms=None):
+    """
+    Solves large TSP instances by cluster-and-stitch decomposition.
+
+    The cities are split into groups of close cities, the tour of every group is
+    solved with Z3 in parallel worker processes, the groups are visited in the
+    order of a heuristic tour of their centres and the joined tour is repaired
+    with 2-opt.
+
+    Args:
+        cities (list): A list of city names.
+        distances (list of lists): A matrix representing distances between cities.
+        cluster_size (int): Maximum number of cities solved together by Z3.
+        workers (int): Number of worker processes, by default one per CPU.
+        cluster_timeout_ms (int): Wall-clock budget of every group in milliseconds.
+        timeout_ms (int): Optional wall-clock budget of the final repair in milliseconds.
+
+    Returns:
+        tuple: A sequence of cities representing the path found and its total distance.
+    """
+    n_city = len(cities)
+    if n_city <= cluster_size:
+        return tsp(cities, distances, "successor", cluster_timeout_ms)
+
+    clusters = cluster_cities(distances, cluster_size)
+
+    # Solve the tour of every group in parallel
+    sub_matrices = [[[distances[a][b] for b in group] for a in group] for group in clusters]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        sub_paths = list(pool.map(_solve_cluster, sub_matrices, [cluster_timeout_ms] * len(clusters)))
+    tours = [[group[i] for i in sub_path] for group, sub_path in zip(clusters, sub_paths)]
+
+    # Visit the groups in the order of a heuristic tour of their centres
+    centres = [group[0] for group in clusters]
+    centre_distances = [[distances[a][b] for b in centres] for a in centres]
+    order = two_opt(nearest_neighbour(centre_distances), centre_distances)
+
+    # Stitch: open every group tour where it is cheapest to enter from the previous group
+    path = list(tours[order[0]])
+    for k in order[1:]:
+        tour = tours[k]
+        size = len(tour)
+        best = None
+        for p in range(size):
+            for step in (1, -1):
+                # Enter at tour[p], walk the group tour and drop the leg that closes it
+                last = tour[(p - step) % size]
+                cost = distances[path[-1]][tour[p]] - distances[last][tour[p]] if step == 1 \
+                    else distances[path[-1]][tour[p]] - distances[tour[p]][last]
+                if best is None or cost < best[0]:
+                    best = (cost, p, step)
+        _, p, step = best
+        path.extend(tour[(p + step * i) % size] for i in range(size))
+
+    # Repair the legs around the stitches
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    path = local_repair(path, distances, deadline=deadline)
+    return path, tour_length(path, distances)
 
 
 # Example usage
@@ -107,12 +726,13 @@ if __name__ == "__main__":
     ]
 
     # Solve for the shortest path
-    path, total_distance = tsp(cities, distances)
+    path, total_distance, lower_bound = tsp(cities, distances, return_bound=True)
 
     if path:
         # If a solution is found, print the path and its total distance
         print("Il cammino più breve: ", [cities[i] for i in path])
         print("Distanza totale: ", total_distance)
+        print("Limite inferiore: ", lower_bound)
     else:
         # If no solution exists, print an appropriate message
         print("Nessuna soluzione trovata!")
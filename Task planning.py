@@ -15,51 +15,303 @@ There must be no overlap between activities.
 
 ### 3 All tasks must be completed within 6 time units.
 
+
+                        ### General plans ###
+
+Any number of tasks can be read from a JSON or CSV file, each with a
+duration, an optional time window, the tasks it must follow and the
+resource it needs (tasks on the same resource must not overlap; by
+default every task uses the same one, as above).
+
+### 4 A task starts after the end of every task it follows.
+
+Before encoding, a critical-path pass over the precedence graph gives
+every task its earliest and latest start, and no-overlap constraints are
+only added for pairs that share a resource, whose narrowed windows
+overlap and that are not already ordered by a chain of precedences.
+Without precedences every resource is a single machine of its own, and
+its tasks go to makespan.py with the encoding picked by choose_encoding().
+
+JSON: {"horizon": 6, "tasks": [{"name": "B", "duration": 2, "window": [0, 6],
+       "after": ["A"], "resource": "crane"}, ...]}   (a bare list of tasks works too)
+CSV:  name,duration,earliest,latest,after,resource   (after separated by ";")
+
 """""
 
+import csv
+import json
+import random
+import sys
+import time
+
 from z3 import *
 
-# We define the beginning and end of each activity
-start_A, end_A = Int("start_A"), Int("end_A")
-start_B, end_B = Int("start_B"), Int("end_B")
-start_C, end_C = Int("start_C"), Int("end_C")
-
-# Durations
-duration_A, duration_B, duration_C = 1, 2, 3
-
-# Constraints (1): Tasks must end after they have started
-durations = [
-    end_A == start_A + duration_A,
-    end_B == start_B + duration_B,
-    end_C == start_C + duration_C,
-]
-
-# Constraints (2): Activities must not overlap
-not_overlap = [
-    Or(end_A <= start_B, end_B <= start_A),
-    Or(end_A <= start_C, end_C <= start_A),
-    Or(end_B <= start_C, end_C <= start_B),
-]
-
-# Time window constraint (3)
-time_window = [
-    And(start_A >= 0, end_A <= 6),
-    And(start_B >= 0, end_B <= 6),
-    And(start_C >= 0, end_C <= 6),
-]
-
-# Let's create the solver and add the constraints
-s = Solver()
-s.add(durations + not_overlap + time_window)
-
-# Let's check the satisfiability
-if s.check() == sat:
+from makespan import choose_encoding, minimize_makespan, overlapping_pairs
+
+# Resource used by the tasks that do not name one
+SHARED_RESOURCE = "shared"
+
+
+def _task(name, duration, earliest=None, latest=None, after=(), resource=SHARED_RESOURCE):
+    """Builds one task in the form used by the planner."""
+    return {"name": str(name), "duration": int(duration),
+            "earliest": None if earliest in (None, "") else int(earliest),
+            "latest": None if latest in (None, "") else int(latest),
+            "after": [str(other) for other in after], "resource": resource}
+
+
+def load_plan(path):
+    """
+    Reads the tasks of a plan from a JSON or CSV file.
+
+    Args:
+        path (str): A .json or .csv file in one of the formats above.
+
+    Returns:
+        tuple: The list of tasks and the horizon (None if the file gives none).
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            tasks = [_task(row["name"], row["duration"], row.get("earliest"), row.get("latest"),
+                           (row.get("after") or "").replace(";", " ").split(),
+                           row.get("resource") or SHARED_RESOURCE)
+                     for row in csv.DictReader(f)]
+        return tasks, None
+
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"tasks": data}
+    tasks = []
+    for item in data["tasks"]:
+        earliest, latest = item.get("window") or (None, None)
+        tasks.append(_task(item["name"], item["duration"], earliest, latest, item.get("after", ()),
+                           item.get("resource", SHARED_RESOURCE)))
+    return tasks, data.get("horizon")
+
+
+def critical_path(tasks, horizon=None):
+    """
+    Computes the earliest and latest start of every task from the windows and the
+    precedences, in time linear in the number of tasks and precedences.
+
+    Args:
+        tasks (list of dicts): The tasks of the plan.
+        horizon (int): Latest end of the tasks without a window (default: sum of the durations).
+
+    Returns:
+        tuple: A topological order of the tasks (indices), and the earliest and latest starts.
+
+    Raises:
+        ValueError: If a task follows an unknown task or the precedences form a cycle.
+    """
+    n_tasks = len(tasks)
+    index = {task["name"]: i for i, task in enumerate(tasks)}
+    if horizon is None:
+        horizon = max((task["earliest"] or 0 for task in tasks), default=0) + sum(task["duration"] for task in tasks)
+
+    successors = [[] for _ in range(n_tasks)]
+    waiting = [0] * n_tasks
+    for j, task in enumerate(tasks):
+        for name in task["after"]:
+            if name not in index:
+                raise ValueError(f"Task {task['name']!r} follows unknown task {name!r}")
+            successors[index[name]].append(j)
+            waiting[j] += 1
+
+    # Kahn's algorithm: a task is ready once every task it follows is placed
+    order = [i for i in range(n_tasks) if waiting[i] == 0]
+    for i in order:
+        for j in successors[i]:
+            waiting[j] -= 1
+            if waiting[j] == 0:
+                order.append(j)
+    if len(order) < n_tasks:
+        raise ValueError("The precedences between the tasks form a cycle")
+
+    # Forward pass: a task cannot start before the end of the tasks it follows
+    earliest = [task["earliest"] or 0 for task in tasks]
+    for i in order:
+        for j in successors[i]:
+            earliest[j] = max(earliest[j], earliest[i] + tasks[i]["duration"])
+
+    # Backward pass: a task must end before the latest start of the tasks following it
+    latest_end = [horizon if task["latest"] is None else task["latest"] for task in tasks]
+    for i in reversed(order):
+        for j in successors[i]:
+            latest_end[i] = min(latest_end[i], latest_end[j] - tasks[j]["duration"])
+    latest = [latest_end[i] - tasks[i]["duration"] for i in range(n_tasks)]
+    return order, earliest, latest
+
+
+def plan_tasks(tasks, horizon=None, timeout_ms=None):
+    """
+    Finds start times for the tasks of a plan.
+
+    Args:
+        tasks (list of dicts): The tasks of the plan.
+        horizon (int): Latest end of the tasks without a window.
+        timeout_ms (int): Optional timeout of the solver in milliseconds.
+
+    Returns:
+        dict: The (start, end) of every task by name.
+        None: If the tasks cannot be planned (or no plan was found in time).
+    """
+    order, earliest, latest = critical_path(tasks, horizon)
+    # The precedence chains alone do not fit in the windows
+    if any(earliest[i] > latest[i] for i in range(len(tasks))):
+        return None
+    if not any(task["after"] for task in tasks):
+        return _plan_machines(tasks, earliest, latest, timeout_ms)
+
+    # above[j] has a bit for every task that must end before task j starts
+    index = {task["name"]: i for i, task in enumerate(tasks)}
+    above = [0] * len(tasks)
+    for j in order:
+        for name in tasks[j]["after"]:
+            i = index[name]
+            above[j] |= above[i] | (1 << i)
+
+    s = Solver()
+    if timeout_ms is not None:
+        s.set("timeout", timeout_ms)
+    starts = [Int(f'start_{task["name"]}') for task in tasks]
+
+    # Constraints (1) and (3): every task runs inside its narrowed window
+    for i, task in enumerate(tasks):
+        s.add(starts[i] >= earliest[i], starts[i] <= latest[i])
+
+    # Constraint (4): precedences
+    for j, task in enumerate(tasks):
+        for name in task["after"]:
+            i = index[name]
+            s.add(starts[j] >= starts[i] + tasks[i]["duration"])
+
+    # Constraint (2): tasks on the same resource must not overlap
+    by_resource = {}
+    for i, task in enumerate(tasks):
+        if task["resource"] is not None:
+            by_resource.setdefault(task["resource"], []).append(i)
+    for members in by_resource.values():
+        windows = [(earliest[i], latest[i] + tasks[i]["duration"]) for i in members]
+        for a, b in overlapping_pairs(windows):
+            i, j = members[a], members[b]
+            # Already ordered by a chain of precedences
+            if (above[j] >> i) & 1 or (above[i] >> j) & 1:
+                continue
+            s.add(Or(starts[i] + tasks[i]["duration"] <= starts[j],
+                     starts[j] + tasks[j]["duration"] <= starts[i]))
+
+    if s.check() != sat:
+        return None
     m = s.model()
-    result = {
-        "A": (m.evaluate(start_A), m.evaluate(end_A)),
-        "B": (m.evaluate(start_B), m.evaluate(end_B)),
-        "C": (m.evaluate(start_C), m.evaluate(end_C)),
-    }
-    print("Planning of activities:", result) #Planning of activities: {'A': (0, 1), 'B': (1, 3), 'C': (3, 6)}
-else:
-    print("No solution found!")
\ No newline at end of file
+    result = {}
+    for i, task in enumerate(tasks):
+        start = m.evaluate(starts[i]).as_long()
+        result[task["name"]] = (start, start + task["duration"])
+    return result
+
+
+def _plan_machines(tasks, earliest, latest, timeout_ms=None):
+    """
+    Plans tasks without precedences: the tasks of every resource run on one machine,
+    scheduled by makespan.minimize_makespan() with the encoding of choose_encoding().
+    """
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    by_resource = {}
+    result = {}
+    for i, task in enumerate(tasks):
+        if task["resource"] is None:
+            result[task["name"]] = (earliest[i], earliest[i] + task["duration"])
+        else:
+            by_resource.setdefault(task["resource"], []).append(i)
+    for members in by_resource.values():
+        durations = [tasks[i]["duration"] for i in members]
+        time_windows = [(earliest[i], latest[i] + tasks[i]["duration"]) for i in members]
+        remaining = None if deadline is None else max(1, int((deadline - time.monotonic()) * 1000))
+        schedule, _ = minimize_makespan(durations, time_windows, 1, timeout_ms=remaining,
+                                        encoding=choose_encoding(durations, time_windows, 1))
+        if schedule is None:
+            return None
+        start_vals, end_vals, _ = schedule
+        for k, i in enumerate(members):
+            result[tasks[i]["name"]] = (start_vals[k], end_vals[k])
+    return result
+
+
+def random_plan(n_tasks, n_resources=None, seed=0, slack=20):
+    """
+    Creates a random plan known to be feasible: a hidden schedule is built first,
+    then every window is widened around it by a random slack.
+
+    Args:
+        n_tasks (int): Number of tasks.
+        n_resources (int): Number of resources, by default one every fifty tasks.
+        seed (int): Seed of the random generator, so that runs are reproducible.
+        slack (int): Largest widening of each side of a window.
+
+    Returns:
+        list of dicts: The tasks of the plan.
+    """
+    rng = random.Random(seed)
+    n_resources = n_resources or max(1, n_tasks // 50)
+    free_at = [0] * n_resources
+    ends = []
+    tasks = []
+    for j in range(n_tasks):
+        # Up to two earlier tasks, close in the list, must come first
+        after = sorted(set(rng.sample(range(max(0, j - 50), j), min(j, rng.randint(0, 2))))) if j else []
+        resource = rng.randrange(n_resources)
+        duration = rng.randint(1, 10)
+        start = max([free_at[resource]] + [ends[i] for i in after]) + rng.randint(0, 2)
+        free_at[resource] = start + duration
+        ends.append(start + duration)
+        tasks.append(_task(f"T{j}", duration, max(0, start - rng.randint(0, slack)),
+                           start + duration + rng.randint(0, slack), [f"T{i}" for i in after], f"R{resource}"))
+    return tasks
+
+
+def benchmark(sizes=(500, 1000, 2000, 5000), seed=0):
+    """
+    Times the critical-path pass, the model and the solver on random plans.
+
+    Returns:
+        list: One dictionary of measurements for each size.
+    """
+    rows = []
+    for n_tasks in sizes:
+        tasks = random_plan(n_tasks, seed=seed)
+        start_time = time.perf_counter()
+        critical_path(tasks)
+        path_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        result = plan_tasks(tasks)
+        total_time = time.perf_counter() - start_time
+        print(f"n={n_tasks:<6} critical path {path_time:7.3f}s  plan {total_time:8.3f}s  "
+              f"{'found' if result else 'not found'}")
+        rows.append({"n": n_tasks, "critical_path_s": path_time, "plan_s": total_time,
+                     "found": result is not None})
+    return rows
+
+
+# Example usage
+if __name__ == "__main__" and len(sys.argv) > 1:
+    if sys.argv[1] == "benchmark":
+        # Random plans of growing size: python "Task planning.py" benchmark
+        benchmark()
+    else:
+        # A plan from a file: python "Task planning.py" plan.json|plan.csv
+        tasks, horizon = load_plan(sys.argv[1])
+        result = plan_tasks(tasks, horizon)
+        print(json.dumps(result) if result is not None else "No solution found!")
+
+elif __name__ == "__main__":
+    # Durations of the tasks, all on the same resource, in a time window of 6 units
+    tasks = [_task("A", 1, 0, 6), _task("B", 2, 0, 6), _task("C", 3, 0, 6)]
+
+    result = plan_tasks(tasks)
+    if result is not None:
+        print("Planning of activities:", result) #Planning of activities: {'A': (5, 6), 'B': (3, 5), 'C': (0, 3)}
+    else:
+        print("No solution found!")
@@ -0,0 +1,480 @@
+"""""
+                ### Cammino Hamiltoniano ###
+
+Modulo condiviso da hamiltonian.py, hamTime.py e hamTimeOut.py:
+cerca un cammino che visiti ogni città del grafo esattamente una volta.
+
+
+                        ### Codifiche ###
+
+### 1 "position": posizione[i] è la città nella posizione i del cammino,
+      e ogni coppia di posizioni consecutive deve essere uno degli archi
+      del grafo (un Or su tutti gli archi per ogni posizione, O(n·|E|)).
+
+### 2 "successor": ogni città sceglie la successiva solo tra i propri
+      vicini (o la fine del cammino), con un Booleano per arco, e
+      l'ordine della successiva è maggiore del proprio, così non si
+      formano cicli (O(n + |E|)).
+
+### 3 "boolean": una matrice di Booleani posizione × città, dove una
+      città in posizione p può essere seguita solo da uno dei suoi
+      vicini in posizione p + 1 (vincoli pseudo-booleani e clausole).
+
+
+                        ### Controlli preliminari ###
+
+Prima di costruire il modello, precheck() guarda la struttura del grafo
+in Python puro e scarta o risolve i casi facili senza chiamare Z3:
+grafo non connesso, più di due città di grado 1, un vertice di taglio
+che lascia più di due componenti, un grafo bipartito con lati troppo
+diversi. Fissa anche gli estremi obbligati del cammino (le città di
+grado 1, mai i vertici di taglio), così il modello resta più piccolo.
+
+
+                        ### Molti grafi ###
+
+hamiltonian_paths() distribuisce un flusso di grafi su un pool di
+processi, ognuno con il proprio contesto Z3, e restituisce i risultati
+man mano che arrivano, tenendone in coda solo pochi alla volta.
+
+"""""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from z3 import *
+import os
+import time  # Importa il modulo per misurare il tempo
+
+# Codifiche disponibili
+ENCODINGS = ("position", "successor", "boolean")
+
+
+def neighbours(graph, n):
+    """
+    Costruisce le liste di adiacenza di un grafo non orientato.
+
+    Args:
+        graph (list of tuples): Lista di archi (u, v).
+        n (int): Numero di città nel grafo.
+
+    Returns:
+        list of lists: I vicini di ogni città, senza ripetizioni né cappi.
+    """
+    adjacency = [set() for _ in range(n)]
+    for u, v in graph:
+        if u != v:
+            adjacency[u].add(v)
+            adjacency[v].add(u)
+    return [sorted(adj) for adj in adjacency]
+
+
+def _components(adjacency, n):
+    """Conta le componenti connesse del grafo."""
+    seen = [False] * n
+    count = 0
+    for root in range(n):
+        if seen[root]:
+            continue
+        count += 1
+        seen[root] = True
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            for u in adjacency[v]:
+                if not seen[u]:
+                    seen[u] = True
+                    stack.append(u)
+    return count
+
+
+def _cut_vertices(adjacency, n):
+    """
+    Trova i vertici di taglio con l'algoritmo di Tarjan (iterativo, senza ricorsione).
+
+    Returns:
+        dict: Per ogni vertice di taglio, il numero di componenti che restano senza di lui.
+    """
+    order = [-1] * n
+    low = [0] * n
+    pieces = {}
+    counter = 0
+    for root in range(n):
+        if order[root] >= 0:
+            continue
+        order[root] = low[root] = counter
+        counter += 1
+        root_children = 0
+        stack = [(root, -1, iter(adjacency[root]))]
+        while stack:
+            v, parent, children = stack[-1]
+            u = next(children, None)
+            if u is None:
+                stack.pop()
+                if parent >= 0:
+                    low[parent] = min(low[parent], low[v])
+                    # Il sottoalbero di v resta staccato se si toglie parent
+                    if parent != root and low[v] >= order[parent]:
+                        pieces[parent] = pieces.get(parent, 1) + 1
+                continue
+            if order[u] < 0:
+                order[u] = low[u] = counter
+                counter += 1
+                if v == root:
+                    root_children += 1
+                stack.append((u, v, iter(adjacency[u])))
+            elif u != parent:
+                low[v] = min(low[v], order[u])
+        if root_children > 1:
+            pieces[root] = root_children
+    return pieces
+
+
+def _bipartition(adjacency, n):
+    """Restituisce il colore (0 o 1) di ogni città se il grafo è bipartito, altrimenti None."""
+    colour = [-1] * n
+    for root in range(n):
+        if colour[root] >= 0:
+            continue
+        colour[root] = 0
+        stack = [root]
+        while stack:
+            v = stack.pop()
+            for u in adjacency[v]:
+                if colour[u] < 0:
+                    colour[u] = 1 - colour[v]
+                    stack.append(u)
+                elif colour[u] == colour[v]:
+                    return None
+    return colour
+
+
+def precheck(graph, n):
+    """
+    Analizza la struttura del grafo prima di costruire il modello Z3.
+
+    Args:
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+
+    Returns:
+        dict: "status" è "sat" (con "path"), "unsat" (con "reason") oppure "unknown".
+              Nel caso "unknown", "start" ed "end" sono gli estremi obbligati (o None)
+              ed "endpoints" l'insieme delle città che possono stare agli estremi.
+    """
+    def unsat(reason):
+        return {"status": "unsat", "reason": reason}
+
+    if n <= 1:
+        return {"status": "sat", "path": list(range(n))}
+
+    adjacency = neighbours(graph, n)
+    degree = [len(adj) for adj in adjacency]
+
+    # Una città isolata o più di due città di grado 1: nessun cammino
+    if min(degree) == 0:
+        return unsat("città isolata")
+    leaves = [v for v in range(n) if degree[v] == 1]
+    if len(leaves) > 2:
+        return unsat(f"{len(leaves)} città di grado 1")
+
+    if _components(adjacency, n) > 1:
+        return unsat("grafo non connesso")
+
+    # Il grafo è già un cammino: basta percorrerlo
+    if len(leaves) == 2 and max(degree) <= 2:
+        path = [leaves[0]]
+        previous = -1
+        while len(path) < n:
+            v = path[-1]
+            u = adjacency[v][0] if adjacency[v][0] != previous else adjacency[v][-1]
+            previous = v
+            path.append(u)
+        return {"status": "sat", "path": path}
+
+    # Togliendo una città interna il cammino si spezza al più in due
+    pieces = _cut_vertices(adjacency, n)
+    for v, count in pieces.items():
+        if count > 2:
+            return unsat(f"la città {v} lascia {count} componenti")
+
+    # Gli estremi non sono mai vertici di taglio
+    endpoints = set(range(n)) - set(pieces)
+
+    # In un grafo bipartito il cammino alterna i lati
+    colour = _bipartition(adjacency, n)
+    if colour is not None:
+        sides = [colour.count(0), colour.count(1)]
+        if abs(sides[0] - sides[1]) > 1:
+            return unsat(f"grafo bipartito con lati {sides[0]} e {sides[1]}")
+        if sides[0] != sides[1]:
+            # Entrambi gli estremi stanno sul lato più grande
+            larger = 0 if sides[0] > sides[1] else 1
+            endpoints = {v for v in endpoints if colour[v] == larger}
+
+    # Le città di grado 1 sono estremi obbligati: il cammino parte dalla prima
+    if any(v not in endpoints for v in leaves):
+        return unsat("una città di grado 1 non può stare a un estremo")
+    if len(endpoints) < 2:
+        return unsat("meno di due estremi possibili")
+    start = leaves[0] if leaves else None
+    end = leaves[1] if len(leaves) == 2 else None
+    return {"status": "unknown", "start": start, "end": end, "endpoints": endpoints}
+
+
+def _encode_position(s, graph, n, start=None, end=None, endpoints=None):
+    """Codifica originale: una città per posizione, un Or su tutti gli archi per ogni passo."""
+    # Variabili di decisione: posizione[i] è la città nella posizione i del cammino
+    position = [Int(f'pos_{i}') for i in range(n)]
+
+    # Ogni posizione deve contenere una città valida (da 0 a n-1)
+    s.add([And(position[i] >= 0, position[i] < n) for i in range(n)])
+
+    # Le città nel cammino devono essere tutte diverse
+    s.add(Distinct(position))
+
+    # Collegamenti tra città: ogni città i deve essere connessa alla città i+1 nel cammino
+    edge_set = set(graph)  # Usa un set per un accesso rapido
+    for i in range(n - 1):
+        u = position[i]
+        v = position[i + 1]
+        s.add(Or([And(u == e[0], v == e[1]) for e in edge_set] +
+                 [And(u == e[1], v == e[0]) for e in edge_set]))
+
+    # Estremi fissati dai controlli preliminari
+    if start is not None:
+        s.add(position[0] == start)
+    if end is not None:
+        s.add(position[n - 1] == end)
+    if endpoints is not None:
+        s.add(Or([position[n - 1] == v for v in endpoints]))
+        if start is None:
+            s.add(Or([position[0] == v for v in endpoints]))
+
+    def read_path(model):
+        return [model.eval(position[i]).as_long() for i in range(n)]
+
+    def hint_path(solver, path):
+        # Suggerisce al solver un cammino noto, anche parziale
+        for i, city in enumerate(path):
+            solver.set_initial_value(position[i], city)
+
+    return read_path, hint_path
+
+
+def _encode_successor(s, graph, n, start=None, end=None, endpoints=None):
+    """Ogni città sceglie la successiva tra i propri vicini, n indica la fine del cammino."""
+    adjacency = neighbours(graph, n)
+
+    # Solo le città ammesse come ultima hanno l'arco verso la fine
+    if end is not None:
+        last = {end}
+    elif endpoints is not None:
+        last = set(endpoints)
+    else:
+        last = set(range(n))
+    successors = [adjacency[v] + ([n] if v in last else []) for v in range(n)]
+
+    # step[v, u] è vero se u segue v nel cammino (u = n se v è l'ultima)
+    step = {(v, u): Bool(f'step_{v}_{u}') for v in range(n) for u in successors[v]}
+    # ordine[v] cresce lungo il cammino
+    order = [Int(f'order_{v}') for v in range(n)]
+
+    for v in range(n):
+        # Il successore è uno dei vicini di v, oppure la fine del cammino
+        s.add(PbEq([(step[v, u], 1) for u in successors[v]], 1))
+        # Ogni città ha al più un predecessore, esattamente uno se non può essere la prima
+        if v == start:
+            s.add([Not(step[u, v]) for u in adjacency[v]])
+            s.add(order[v] == 0)
+        elif adjacency[v]:
+            if start is not None or (endpoints is not None and v not in endpoints):
+                s.add(PbEq([(step[u, v], 1) for u in adjacency[v]], 1))
+            else:
+                s.add(PbLe([(step[u, v], 1) for u in adjacency[v]], 1))
+        s.add(And(order[v] >= 0, order[v] < n))
+        # La città successiva viene dopo: niente cicli
+        for u in adjacency[v]:
+            s.add(Implies(step[v, u], order[u] >= order[v] + 1))
+
+    # Un solo cammino arriva alla fine
+    s.add(PbEq([(step[v, n], 1) for v in sorted(last)], 1))
+
+    def read_path(model):
+        ranks = [model.eval(order[v]).as_long() for v in range(n)]
+        return sorted(range(n), key=ranks.__getitem__)
+
+    def hint_path(solver, path):
+        # Suggerisce al solver un cammino noto, anche parziale
+        for i, city in enumerate(path):
+            solver.set_initial_value(order[city], i)
+            if i + 1 < len(path) and (city, path[i + 1]) in step:
+                solver.set_initial_value(step[city, path[i + 1]], True)
+
+    return read_path, hint_path
+
+
+def _encode_boolean(s, graph, n, start=None, end=None, endpoints=None):
+    """Matrice di Booleani posizione × città, i passi seguono solo gli archi del grafo."""
+    adjacency = neighbours(graph, n)
+
+    # at[p][v] è vero se la città v è in posizione p
+    at = [[Bool(f'at_{p}_{v}') for v in range(n)] for p in range(n)]
+
+    # Una città per posizione e una posizione per città
+    for p in range(n):
+        s.add(PbEq([(at[p][v], 1) for v in range(n)], 1))
+    for v in range(n):
+        s.add(PbEq([(at[p][v], 1) for p in range(n)], 1))
+
+    # La città in posizione p + 1 deve essere un vicino di quella in posizione p
+    for p in range(n - 1):
+        for v in range(n):
+            s.add(Or([Not(at[p][v])] + [at[p + 1][u] for u in adjacency[v]]))
+
+    # Estremi fissati dai controlli preliminari
+    if start is not None:
+        s.add(at[0][start])
+    if end is not None:
+        s.add(at[n - 1][end])
+    if endpoints is not None:
+        s.add([Not(at[0][v]) for v in range(n) if v not in endpoints])
+        s.add([Not(at[n - 1][v]) for v in range(n) if v not in endpoints])
+
+    def read_path(model):
+        return [next(v for v in range(n) if is_true(model.eval(at[p][v]))) for p in range(n)]
+
+    def hint_path(solver, path):
+        # Suggerisce al solver un cammino noto, anche parziale
+        for p, city in enumerate(path):
+            solver.set_initial_value(at[p][city], True)
+
+    return read_path, hint_path
+
+
+def build_model(graph, n, encoding="successor", start=None, end=None, endpoints=None):
+    """
+    Costruisce il modello del cammino Hamiltoniano senza risolverlo.
+
+    Args:
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+        encoding (str): Una delle codifiche in ENCODINGS.
+        start (int): Prima città del cammino, se già nota.
+        end (int): Ultima città del cammino, se già nota.
+        endpoints (set): Città che possono stare agli estremi, se già note.
+
+    Returns:
+        tuple: Il Solver e due funzioni: una legge il cammino da un modello,
+               l'altra suggerisce al solver un cammino noto (anche parziale).
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Codifica sconosciuta {encoding!r}, attese: {ENCODINGS}")
+
+    # Crea un Solver
+    s = Solver()
+    if encoding == "position":
+        encode = _encode_position
+    elif encoding == "successor":
+        encode = _encode_successor
+    else:
+        encode = _encode_boolean
+    read_path, hint_path = encode(s, graph, n, start, end, endpoints)
+    return s, read_path, hint_path
+
+
+def hamiltonian_path(cities, graph, n, timeout_ms=None, encoding="successor", structure=True):
+    """
+    Risolve il problema del cammino Hamiltoniano per un grafo dato di città.
+
+    Args:
+        cities (list): Lista di città etichettate da 0 a n-1.
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+        timeout_ms (int): Timeout opzionale in millisecondi.
+        encoding (str): Una delle codifiche in ENCODINGS.
+        structure (bool): Esegue precheck() prima di chiamare Z3.
+
+    Returns:
+        tuple: Il cammino Hamiltoniano (indici delle città) e il tempo di esecuzione del solver.
+        tuple: (None, execution_time) se il cammino non esiste o se si verifica un timeout.
+    """
+    pins = {}
+    check_time = 0.0
+    if structure:
+        start_time = time.time()
+        verdict = precheck(graph, n)
+        check_time = time.time() - start_time
+        # Casi decisi dalla sola struttura del grafo
+        if verdict["status"] == "sat":
+            return verdict["path"], check_time
+        if verdict["status"] == "unsat":
+            return None, check_time
+        pins = {key: verdict[key] for key in ("start", "end", "endpoints")}
+
+    s, read_path, _ = build_model(graph, n, encoding, **pins)
+    if timeout_ms is not None:
+        s.set("timeout", timeout_ms)  # Imposta il timeout in millisecondi
+
+    # Inizia a misurare il tempo di esecuzione (controlli preliminari compresi)
+    start_time = time.time() - check_time
+
+    # Risolvi il problema
+    try:
+        if s.check() == sat:
+            path = read_path(s.model())
+            execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
+            return path, execution_time
+    except Z3Exception:
+        # Z3 non è riuscito a risolvere il problema entro il timeout
+        pass
+    execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
+    return None, execution_time
+
+
+def is_hamiltonian_path(path, graph, n):
+    """Verifica che path visiti ogni città una volta seguendo gli archi del grafo."""
+    edge_set = {frozenset(e) for e in graph}
+    return (path is not None and sorted(path) == list(range(n)) and
+            all(frozenset((path[i], path[i + 1])) in edge_set for i in range(n - 1)))
+
+
+def _solve_graph(index, graph, n, timeout_ms, encoding):
+    """Risolve un grafo del flusso in un processo del pool."""
+    return index, hamiltonian_path(None, graph, n, timeout_ms, encoding)
+
+
+def hamiltonian_paths(graphs, workers=None, timeout_ms=None, encoding="successor"):
+    """
+    Risolve molti grafi in parallelo, restituendo i risultati appena sono pronti.
+
+    Al più due grafi per processo vengono letti in anticipo, così la memoria
+    resta costante qualunque sia la lunghezza del flusso.
+
+    Args:
+        graphs (iterable): Coppie (graph, n), una per grafo.
+        workers (int): Numero di processi, ognuno con il proprio contesto Z3;
+            0 risolve i grafi in questo processo.
+        timeout_ms (int): Timeout opzionale per ogni grafo, in millisecondi.
+        encoding (str): Una delle codifiche in ENCODINGS.
+
+    Yields:
+        tuple: La posizione del grafo nel flusso e il risultato (path, execution_time)
+               di hamiltonian_path(), nell'ordine in cui i grafi vengono risolti.
+    """
+    if workers == 0:
+        for index, (graph, n) in enumerate(graphs):
+            yield _solve_graph(index, graph, n, timeout_ms, encoding)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for index, (graph, n) in enumerate(graphs):
+            pending.add(pool.submit(_solve_graph, index, graph, n, timeout_ms, encoding))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
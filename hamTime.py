@@ -1,74 +1,302 @@
-from z3 import *
-import time  # Importa il modulo per misurare il tempo
+"""""
+                ### Cammino Hamiltoniano, benchmark ###
+
+Confronta le codifiche di hamPath.py su famiglie di grafi riproducibili
+(ogni grafo dipende solo da n e dal seme) al crescere del numero di città.
+
+Per ogni caso misura separatamente i controlli preliminari, la
+costruzione del modello in Python e la risoluzione con Z3, insieme alla
+memoria di picco e alle statistiche del solver. Ogni caso gira in un
+processo nuovo, così la memoria di una codifica non pesa sulla successiva.
+
+I risultati si possono salvare in CSV o JSON per confrontare versioni diverse.
+
+"""""
+
+import csv
+import json
+import math
+import multiprocessing
+import os
 import random
+import resource
+import sys
+import time
+
+from z3 import sat, unknown
+
+from hamPath import ENCODINGS, build_model, hamiltonian_path, hamiltonian_paths, is_hamiltonian_path, precheck
+
+
+def ring_with_chords(n, seed=0):
+    """
+    Crea un grafo ad anello con circa n / 10 archi casuali in più.
+
+    Args:
+        n (int): Numero di città.
+        seed (int): Seme del generatore casuale.
+
+    Returns:
+        list of tuples: Lista di archi (u, v).
+    """
+    rng = random.Random(seed)
+    graph = [(i, (i + 1) % n) for i in range(n)]
+    edges = {frozenset(e) for e in graph}  # Usa un set per un accesso rapido
+    for _ in range(n // 10):
+        u = rng.randint(0, n - 1)
+        v = rng.randint(0, n - 1)
+        if u != v and frozenset((u, v)) not in edges:
+            edges.add(frozenset((u, v)))
+            graph.append((u, v))
+    return graph
+
+
+def random_regular(n, seed=0, degree=3):
+    """
+    Crea un grafo casuale in cui ogni città ha lo stesso grado (modello a configurazione).
+
+    Args:
+        n (int): Numero di città (n * degree deve essere pari).
+        seed (int): Seme del generatore casuale.
+        degree (int): Grado di ogni città.
+
+    Returns:
+        list of tuples: Lista di archi (u, v).
+    """
+    if n * degree % 2:
+        raise ValueError("n * degree deve essere pari")
+    rng = random.Random(seed)
+    while True:
+        # Accoppia a caso le "mezze connessioni" e riprova se escono cappi o archi doppi
+        stubs = [v for v in range(n) for _ in range(degree)]
+        rng.shuffle(stubs)
+        edges = {frozenset(stubs[i:i + 2]) for i in range(0, len(stubs), 2)}
+        if len(edges) == len(stubs) // 2 and all(len(e) == 2 for e in edges):
+            return sorted(tuple(sorted(e)) for e in edges)
+
+
+def erdos_renyi(n, seed=0, c=1.0):
+    """
+    Crea un grafo casuale G(n, p) vicino alla soglia in cui compare un cammino Hamiltoniano.
+
+    Args:
+        n (int): Numero di città.
+        seed (int): Seme del generatore casuale.
+        c (float): Scarto dalla soglia, p = (ln n + ln ln n + c) / n.
+
+    Returns:
+        list of tuples: Lista di archi (u, v).
+    """
+    rng = random.Random(seed)
+    p = min(1.0, (math.log(n) + math.log(max(math.log(n), 1.0)) + c) / n)
+    return [(u, v) for u in range(n) for v in range(u + 1, n) if rng.random() < p]
+
 
-def hamiltonian_path(cities, graph, n):
+def no_path(n, seed=0):
     """
-    Risolve il problema del cammino Hamiltoniano per un grafo dato di città.
+    Crea un grafo senza cammino Hamiltoniano che i controlli preliminari non riconoscono.
+
+    Un lato piccolo S di k città e un lato grande di k + 2 città collegate
+    solo a S: togliendo S restano k + 2 città isolate, troppe per un
+    cammino che passa k volte da S. Un anello su S con una corda che chiude il
+    triangolo S[0], S[1], S[2] rende il grafo non bipartito (da k = 3, cioè n >= 8).
 
     Args:
-        cities (list): Lista di città etichettate da 0 a n-1.
-        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
-        n (int): Numero di città nel grafo.
+        n (int): Numero di città.
+        seed (int): Seme del generatore casuale.
 
     Returns:
-        tuple: Una tupla contenente la sequenza di città che rappresenta il cammino Hamiltoniano e il tempo di esecuzione, se esiste.
-        tuple: (None, execution_time) se il cammino non esiste.
+        list of tuples: Lista di archi (u, v).
+    """
+    rng = random.Random(seed)
+    labels = list(range(n))
+    rng.shuffle(labels)
+    k = (n - 2) // 2
+    small, large = labels[:k], labels[k:]
+    graph = [(small[i], small[(i + 1) % k]) for i in range(k)] if k > 2 else []
+    if k > 3:
+        # Con k pari l'anello da solo è un ciclo pari: serve un ciclo dispari
+        graph.append((small[0], small[2]))
+    for v in large:
+        for u in rng.sample(small, min(3, k)):
+            graph.append((u, v))
+    return graph
+
+
+# Famiglie di grafi del benchmark
+FAMILIES = {
+    "ring": ring_with_chords,
+    "regular": random_regular,
+    "erdos_renyi": erdos_renyi,
+    "no_path": no_path,
+}
+
+
+def peak_memory_mb():
+    """Memoria residente di picco del processo corrente in megabyte."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux riporta kilobyte, macOS byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(family, n, encoding, timeout_ms, seed):
+    """Costruisce e risolve un caso, restituendo le sue misure."""
+    graph = FAMILIES[family](n, seed)
+    base_memory = peak_memory_mb()
+    row = {"family": family, "n": n, "edges": len(graph), "encoding": encoding, "seed": seed,
+           "precheck_s": 0.0, "build_s": 0.0, "solve_s": 0.0, "decided_by": "precheck", "stats": {}}
+
+    start_time = time.perf_counter()
+    verdict = precheck(graph, n)
+    row["precheck_s"] = time.perf_counter() - start_time
+
+    if verdict["status"] != "unknown":
+        row["status"] = verdict["status"]
+    else:
+        pins = {key: verdict[key] for key in ("start", "end", "endpoints")}
+        start_time = time.perf_counter()
+        s, read_path, _ = build_model(graph, n, encoding, **pins)
+        row["build_s"] = time.perf_counter() - start_time
+
+        s.set("timeout", timeout_ms)
+        start_time = time.perf_counter()
+        result = s.check()
+        row["solve_s"] = time.perf_counter() - start_time
+
+        row["decided_by"] = "z3"
+        row["status"] = "timeout" if result == unknown else str(result)
+        if result == sat and not is_hamiltonian_path(read_path(s.model()), graph, n):
+            row["status"] = "wrong"
+        statistics = s.statistics()
+        row["stats"] = {key: statistics.get_key_value(key) for key in statistics.keys()}
+
+    row["peak_mb"] = peak_memory_mb() - base_memory
+    return row
+
+
+def run_isolated(func, *args):
+    """Esegue func(*args) in un processo nuovo e ne restituisce il risultato."""
+    with multiprocessing.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+# Statistiche di Z3 riportate come colonne nel CSV
+STAT_COLUMNS = ("conflicts", "decisions", "propagations", "max memory")
+
+
+def save_results(rows, output):
+    """
+    Salva i risultati in CSV (se output finisce in .csv) o in JSON.
+
+    Args:
+        rows (list of dicts): Le righe restituite da benchmark().
+        output (str): Percorso del file.
     """
-    # Crea un Solver
-    s = Solver()
-
-    # Variabili di decisione: posizione[i] è la città nella posizione i del cammino
-    position = [Int(f'pos_{i}') for i in range(n)]
-
-    # Ogni posizione deve contenere una città valida (da 0 a n-1)
-    s.add([And(position[i] >= 0, position[i] < n) for i in range(n)])
-
-    # Le città nel cammino devono essere tutte diverse
-    s.add(Distinct(position))
-
-    # Collegamenti tra città: ogni città i deve essere connessa alla città i+1 nel cammino
-    edge_set = set(graph)  # Usa un set per un accesso rapido
-    for i in range(n - 1):
-        u = position[i]
-        v = position[i + 1]
-        s.add(Or([And(u == e[0], v == e[1]) for e in edge_set] +
-                 [And(u == e[1], v == e[0]) for e in edge_set]))
-
-    # Inizia a misurare il tempo di esecuzione
-    start_time = time.time()
-
-    # Risolvi il problema
-    if s.check() == sat:
-        model = s.model()
-        path = [model.eval(position[i]).as_long() for i in range(n)]
-        execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
-        return path, execution_time  # Restituisci sia il cammino che il tempo
+    if output.endswith(".csv"):
+        columns = [key for key in rows[0] if key != "stats"] + list(STAT_COLUMNS)
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for row in rows:
+                flat = {key: value for key, value in row.items() if key != "stats"}
+                flat.update({key: row["stats"].get(key, "") for key in STAT_COLUMNS})
+                writer.writerow(flat)
     else:
-        execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
-        return None, execution_time  # Restituisci None e il tempo
+        with open(output, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+def benchmark(families=tuple(FAMILIES), sizes=(10, 20, 50, 100, 200, 500, 1000), encodings=ENCODINGS,
+              timeout_ms=10000, seed=0, output=None):
+    """
+    Esegue ogni codifica su ogni famiglia di grafi al crescere di n.
+
+    Una codifica che va in timeout su una famiglia, o la cui costruzione del modello
+    dura più del timeout, non viene provata sui grafi più grandi.
+
+    Args:
+        families (tuple): Nomi delle famiglie in FAMILIES.
+        sizes (tuple): Numeri di città da provare.
+        encodings (tuple): Codifiche di hamPath.py da confrontare.
+        timeout_ms (int): Timeout del solver per ogni caso, in millisecondi.
+        seed (int): Seme dei grafi.
+        output (str): File .csv o .json in cui salvare i risultati (opzionale).
+
+    Returns:
+        list of dicts: Una riga di misure per ogni caso.
+    """
+    rows = []
+    print(f"{'famiglia':>12} {'n':>5} {'codifica':>10} {'controlli':>10} {'costruzione':>12} "
+          f"{'soluzione':>10} {'memoria':>9}  esito")
+    for family in families:
+        given_up = set()
+        for n in sizes:
+            for encoding in encodings:
+                if encoding in given_up:
+                    continue
+                row = run_isolated(_run_case, family, n, encoding, timeout_ms, seed)
+                rows.append(row)
+                print(f"{family:>12} {n:>5} {encoding:>10} {row['precheck_s']:>9.4f}s "
+                      f"{row['build_s']:>11.3f}s {row['solve_s']:>9.3f}s {row['peak_mb']:>7.1f}MB  "
+                      f"{row['status']} ({row['decided_by']})")
+                if row["status"] == "timeout" or row["build_s"] * 1000 > timeout_ms:
+                    given_up.add(encoding)
+
+    if output:
+        save_results(rows, output)
+    return rows
+
+
+def benchmark_batch(family="regular", n=100, n_graphs=200, workers=None, timeout_ms=10000):
+    """
+    Misura quanti grafi al secondo risolve hamiltonian_paths() al variare dei processi.
+
+    Args:
+        family (str): Famiglia di grafi in FAMILIES.
+        n (int): Numero di città di ogni grafo.
+        n_graphs (int): Numero di grafi del flusso (semi da 0 a n_graphs - 1).
+        workers (tuple): Numeri di processi da confrontare, di default 1 e tutte le CPU.
+        timeout_ms (int): Timeout del solver per ogni grafo, in millisecondi.
+
+    Returns:
+        list of dicts: Una riga di misure per ogni numero di processi.
+    """
+    if workers is None:
+        workers = sorted({1, os.cpu_count() or 1})
+    rows = []
+    serial_time = None
+    for n_workers in workers:
+        graphs = ((FAMILIES[family](n, seed), n) for seed in range(n_graphs))
+        start_time = time.perf_counter()
+        found = sum(path is not None for _, (path, _) in hamiltonian_paths(graphs, n_workers, timeout_ms))
+        elapsed = time.perf_counter() - start_time
+        serial_time = serial_time or elapsed
+        print(f"{family} n={n} grafi {n_graphs} processi {n_workers:<3} tempo {elapsed:8.2f}s  "
+              f"{n_graphs / elapsed:7.1f} grafi/s  speedup {serial_time / elapsed:5.2f}x  cammini {found}")
+        rows.append({"family": family, "n": n, "graphs": n_graphs, "workers": n_workers,
+                     "time_s": elapsed, "found": found})
+    return rows
+
 
 # Esempio di utilizzo
 if __name__ == "__main__":
+    # python hamTime.py benchmark [risultati.csv|risultati.json] esegue il benchmark completo
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark(output=sys.argv[2] if len(sys.argv) > 2 else None)
+        sys.exit()
+    # python hamTime.py batch misura il flusso di molti grafi su più processi
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        benchmark_batch()
+        sys.exit()
+
     # Numero di città
     n = 200
 
     # Crea l'array cities
     cities = [f"City_{i}" for i in range(n)]
 
-    # Crea l'array graph con le connessioni
-    graph = []
-
-    # Aggiungi le connessioni cicliche (ogni città connessa alla successiva, ultima con la prima)
-    for i in range(n):
-        graph.append((i, (i + 1) % n))  # Connessione tra la città i e la città (i+1)%n (ciclo)
-
-    # Aggiungi connessioni casuali tra alcune città
-    for _ in range(n // 10):  # Aggiungi circa un decimo delle città con connessioni casuali
-        u = random.randint(0, n - 1)
-        v = random.randint(0, n - 1)
-        if u != v and (u, v) not in graph and (v, u) not in graph:  # Assicurati che la connessione non esista già
-            graph.append((u, v))
+    # Anello (ogni città connessa alla successiva, ultima con la prima) con connessioni casuali
+    graph = ring_with_chords(n, seed=0)
 
     # Trova il cammino Hamiltoniano
     result, execution_time = hamiltonian_path(cities, graph, n)
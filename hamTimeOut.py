@@ -1,63 +1,250 @@
-from z3 import *
-import time  # Importa il modulo per misurare il tempo
+import multiprocessing
+import os
+import queue
 import random
+import time
 
+from z3 import sat, unsat
 
-def hamiltonian_path(cities, graph, n, timeout_ms=5000):
+from hamPath import build_model, neighbours, precheck
+
+
+# Codifiche del portfolio, dalla più veloce: con pochi processi restano le prime
+PORTFOLIO = ("successor", "boolean", "position")
+
+
+def _portfolio_worker(graph, n, encoding, seed, pins, deadline, results):
+    """Risolve il grafo con una codifica e un seme, e mette l'esito nella coda results."""
+    s, read_path, _ = build_model(graph, n, encoding, **pins)
+    s.set("random_seed", seed)
+    # Il tempo speso a costruire il modello conta nel budget comune
+    s.set("timeout", max(1, int((deadline - time.time()) * 1000)))
+    result = s.check()
+    path = read_path(s.model()) if result == sat else None
+    results.put((encoding, seed, str(result), path))
+
+
+def portfolio_path(graph, n, timeout_ms=5000, encodings=PORTFOLIO, seeds=(0, 1), workers=None):
     """
-    Risolve il problema del cammino Hamiltoniano per un grafo dato di città con un timeout.
+    Lancia più configurazioni del solver in processi paralleli: vince la prima risposta certa.
 
     Args:
-        cities (list): Lista di città etichettate da 0 a n-1.
         graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
         n (int): Numero di città nel grafo.
-        timeout_ms (int): Timeout in millisecondi (default 5000 ms = 5 secondi).
+        timeout_ms (int): Budget complessivo in millisecondi.
+        encodings (tuple): Codifiche di hamPath.py da provare.
+        seeds (tuple): Semi casuali di Z3 da provare per ogni codifica.
+        workers (int): Numero massimo di processi (default: numero di CPU).
 
     Returns:
-        tuple: Una tupla contenente la sequenza di città che rappresenta il cammino Hamiltoniano e il tempo di esecuzione, se esiste.
-        None: Se il cammino non esiste o se si verifica un timeout.
+        tuple: Il cammino Hamiltoniano (indici delle città) o None, il tempo di esecuzione
+               e la configurazione (codifica, seme) che ha risposto, oppure None.
     """
-    # Crea un Solver con il timeout
-    s = Solver()
-    s.set("timeout", timeout_ms)  # Imposta il timeout in millisecondi
+    start_time = time.time()
+    deadline = start_time + timeout_ms / 1000
+
+    # I casi facili si decidono senza avviare processi
+    verdict = precheck(graph, n)
+    if verdict["status"] != "unknown":
+        return verdict.get("path"), time.time() - start_time, None
+    pins = {key: verdict[key] for key in ("start", "end", "endpoints")}
+
+    # Prima tutte le codifiche con il primo seme, poi gli altri semi
+    configs = [(encoding, seed) for seed in seeds for encoding in encodings]
+    configs = configs[:workers or os.cpu_count() or 1]
+
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_portfolio_worker, daemon=True,
+                                         args=(graph, n, encoding, seed, pins, deadline, results))
+                 for encoding, seed in configs]
+    for process in processes:
+        process.start()
+
+    path, winner = None, None
+    try:
+        for _ in processes:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                encoding, seed, status, found = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # Una risposta certa chiude la gara, un timeout no
+            if status in (str(sat), str(unsat)):
+                path, winner = found, (encoding, seed)
+                break
+    finally:
+        # Ferma subito i processi rimasti, così non consumano CPU
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    return path, time.time() - start_time, winner
+
+
+def longest_path(graph, n, deadline, start=None, end=None, seed=0):
+    """
+    Cerca un cammino lungo con una visita in profondità e le rotazioni di Pósa.
+
+    Il cammino si allunga verso il vicino libero con meno vicini liberi
+    (regola di Warnsdorff). Quando l'ultima città non ha vicini liberi, il
+    cammino viene ruotato su un vicino già visitato: il tratto finale si
+    inverte e l'ultima città cambia. Se le rotazioni non portano a nulla si
+    riparte da un'altra città, concedendo ogni volta più rotazioni.
+
+    Args:
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+        deadline (float): Valore di time.time() oltre il quale la ricerca si ferma.
+        start (int): Prima città obbligata (opzionale).
+        end (int): Ultima città obbligata (opzionale).
+        seed (int): Seme del generatore casuale.
+
+    Returns:
+        list: Il cammino più lungo trovato (completo se ha n città).
+    """
+    adjacency = neighbours(graph, n)
+    rng = random.Random(seed)
+    best = []
+    restarts = 0
+
+    while time.time() < deadline:
+        restarts += 1
+        first = start if start is not None else rng.randrange(n)
+        path = [first]
+        index = [-1] * n  # Posizione di ogni città nel cammino, -1 se libera
+        index[first] = 0
+        free_degree = [len(adj) for adj in adjacency]  # Vicini ancora liberi
+        for w in adjacency[first]:
+            free_degree[w] -= 1
 
-    # Variabili di decisione: posizione[i] è la città nella posizione i del cammino
-    position = [Int(f'pos_{i}') for i in range(n)]
+        rotations = 0
+        while len(path) < n and rotations < restarts * n and time.time() < deadline:
+            last = path[-1]
+            # L'ultima città obbligata entra solo alla fine
+            free = [u for u in adjacency[last] if index[u] < 0 and (u != end or len(path) == n - 1)]
+            if free:
+                u = min(free, key=lambda u: (free_degree[u], rng.random()))
+                index[u] = len(path)
+                path.append(u)
+                for w in adjacency[u]:
+                    free_degree[w] -= 1
+                rotations = 0
+                continue
 
-    # Ogni posizione deve contenere una città valida (da 0 a n-1)
-    s.add([And(position[i] >= 0, position[i] < n) for i in range(n)])
+            # Senza estremi obbligati si può provare ad allungare dall'altra parte
+            if start is None and free_degree[path[0]] > 0 and free_degree[last] == 0:
+                path.reverse()
+                for i, city in enumerate(path):
+                    index[city] = i
+                continue
 
-    # Le città nel cammino devono essere tutte diverse
-    s.add(Distinct(position))
+            # Rotazione di Pósa: si preferiscono i perni che lasciano un'ultima città con vicini liberi
+            # (le città libere hanno indice -1, compresa la fine fissata: non sono perni)
+            pivots = [u for u in adjacency[last] if 0 <= index[u] < len(path) - 2]
+            if not pivots:
+                break
+            useful = [u for u in pivots if free_degree[path[index[u] + 1]] > 0]
+            i = index[rng.choice(useful or pivots)]
+            path[i + 1:] = path[:i:-1]
+            for j in range(i + 1, len(path)):
+                index[path[j]] = j
+            rotations += 1
 
-    # Collegamenti tra città: ogni città i deve essere connessa alla città i+1 nel cammino
-    edge_set = set(graph)  # Usa un set per un accesso rapido
-    for i in range(n - 1):
-        u = position[i]
-        v = position[i + 1]
-        s.add(Or([And(u == e[0], v == e[1]) for e in edge_set] +
-                 [And(u == e[1], v == e[0]) for e in edge_set]))
+        if len(path) > len(best):
+            best = path
+        if len(best) == n:
+            break
+    return best
 
-    # Inizia a misurare il tempo di esecuzione
+
+def _is_simple_path(path, graph):
+    """Verifica che path segua gli archi del grafo senza ripetere città."""
+    edge_set = {frozenset(e) for e in graph}
+    return (len(set(path)) == len(path) and
+            all(frozenset((path[i], path[i + 1])) in edge_set for i in range(len(path) - 1)))
+
+
+def anytime_path(graph, n, timeout_ms=5000, encoding="successor", heuristic_share=0.25, seed=0):
+    """
+    Cerca un cammino Hamiltoniano prima con longest_path(), poi con Z3 partendo dal cammino migliore.
+
+    Args:
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+        timeout_ms (int): Budget complessivo in millisecondi.
+        encoding (str): Codifica di hamPath.py usata da Z3.
+        heuristic_share (float): Quota del budget lasciata all'euristica.
+        seed (int): Seme dell'euristica.
+
+    Returns:
+        tuple: Il cammino, l'esito ("sat", "unsat" o "timeout") e il tempo di esecuzione.
+               Con "timeout" e "unsat" il cammino è il più lungo trovato, verificato ma parziale.
+    """
     start_time = time.time()
+    deadline = start_time + timeout_ms / 1000
 
-    # Risolvi il problema
-    result = None
-    try:
-        if s.check() == sat:
-            model = s.model()
-            path = [model.eval(position[i]).as_long() for i in range(n)]
-            execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
-            result = (path, execution_time)
-        else:
-            execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
-            result = (None, execution_time)
-    except Z3Exception:
-        # Gestisci il caso in cui Z3 non riesca a risolvere il problema entro il timeout
-        execution_time = time.time() - start_time
-        result = (None, execution_time)
-
-    return result
+    # I casi facili si decidono senza cercare
+    verdict = precheck(graph, n)
+    if verdict["status"] == "sat":
+        return verdict["path"], "sat", time.time() - start_time
+    if verdict["status"] == "unsat":
+        # Il cammino completo non esiste, ma quello più lungo serve comunque
+        best = longest_path(graph, n, start_time + heuristic_share * timeout_ms / 1000, seed=seed)
+        return best, "unsat", time.time() - start_time
+    pins = {key: verdict[key] for key in ("start", "end", "endpoints")}
+
+    # L'euristica trova spesso il cammino completo da sola
+    best = longest_path(graph, n, start_time + heuristic_share * timeout_ms / 1000,
+                        verdict["start"], verdict["end"], seed)
+    if len(best) == n:
+        return best, "sat", time.time() - start_time
+
+    # Z3 parte dal cammino più lungo trovato
+    s, read_path, hint_path = build_model(graph, n, encoding, **pins)
+    hint_path(s, best)
+    remaining = int((deadline - time.time()) * 1000)
+    status = "timeout"
+    if remaining > 0:
+        s.set("timeout", remaining)
+        result = s.check()
+        if result == sat:
+            best, status = read_path(s.model()), "sat"
+        elif result == unsat:
+            status = "unsat"
+
+    # Il cammino restituito viene sempre verificato sul grafo (anche con python -O)
+    if not _is_simple_path(best, graph):
+        raise RuntimeError(f"Cammino non valido per il grafo: {best}")
+    return best, status, time.time() - start_time
+
+
+def hamiltonian_path(cities, graph, n, timeout_ms=5000, portfolio=False):
+    """
+    Risolve il problema del cammino Hamiltoniano per un grafo dato di città con un timeout.
+
+    Args:
+        cities (list): Lista di città etichettate da 0 a n-1.
+        graph (list of tuples): Lista di archi (u, v) che rappresentano il grafo delle città.
+        n (int): Numero di città nel grafo.
+        timeout_ms (int): Timeout in millisecondi (default 5000 ms = 5 secondi).
+        portfolio (bool): Usa portfolio_path() con più codifiche e semi in parallelo.
+
+    Returns:
+        tuple: Una tupla contenente la sequenza di città che rappresenta il cammino Hamiltoniano e il tempo di esecuzione, se esiste.
+        tuple: (cammino parziale, execution_time) se si verifica un timeout: il cammino più lungo trovato.
+        tuple: (None, execution_time) se il cammino non esiste.
+    """
+    if portfolio:
+        path, execution_time, _ = portfolio_path(graph, n, timeout_ms)
+        return path, execution_time
+    path, status, execution_time = anytime_path(graph, n, timeout_ms)
+    if status == "unsat":
+        return None, execution_time
+    return path, execution_time
 
 
 # Esempio di utilizzo
@@ -86,7 +273,9 @@ if __name__ == "__main__":
     result = hamiltonian_path(cities, graph, n, timeout_ms=5000)
 
     # Controlla se il risultato è valido
-    if result and result[0]:
+    if result and result[0] and len(result[0]) < n:
+        print(f"Timeout, cammino parziale di {len(result[0])} città:", result[0])
+    elif result and result[0]:
         print("Cammino Hamiltoniano trovato:", result[0])
     else:
         print("Nessun cammino Hamiltoniano trovato.")
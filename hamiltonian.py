@@ -1,5 +1,4 @@
-from z3 import *
-import time  # Importa il modulo per misurare il tempo
+from hamPath import hamiltonian_path as _hamiltonian_path
 
 
 def hamiltonian_path(cities, graph, n):
@@ -15,39 +14,11 @@ def hamiltonian_path(cities, graph, n):
         list: Una sequenza di città che rappresenta il cammino Hamiltoniano, se esiste.
         None: Se il cammino non esiste.
     """
-    # Crea un Solver
-    s = Solver()
-
-    # Variabili di decisione: posizione[i] è la città nella posizione i del cammino
-    position = [Int(f'pos_{i}') for i in range(n)]
-
-    # Ogni posizione deve contenere una città valida (da 0 a n-1)
-    s.add([And(position[i] >= 0, position[i] < n) for i in range(n)])
-
-    # Le città nel cammino devono essere tutte diverse
-    s.add(Distinct(position))
-
-    # Collegamenti tra città: ogni città i deve essere connessa alla città i+1 nel cammino
-    edge_set = set(graph)  # Usa un set per un accesso rapido
-    for i in range(n - 1):
-        u = position[i]
-        v = position[i + 1]
-        s.add(Or([And(u == e[0], v == e[1]) for e in edge_set] +
-                 [And(u == e[1], v == e[0]) for e in edge_set]))
-
-    # Inizia a misurare il tempo di esecuzione
-    start_time = time.time()
-
-    # Risolvi il problema
-    if s.check() == sat:
-        model = s.model()
-        path = [model.eval(position[i]).as_long() for i in range(n)]
-        # Restituisci il cammino delle città (in ordine)
-        execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
-        return [cities[i] for i in path], execution_time
-    else:
-        execution_time = time.time() - start_time  # Calcola il tempo di esecuzione
+    path, execution_time = _hamiltonian_path(cities, graph, n)
+    if path is None:
         return None, execution_time
+    # Restituisci il cammino delle città (in ordine)
+    return [cities[i] for i in path], execution_time
 
 
 # Esempio di utilizzo
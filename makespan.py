@@ -21,94 +21,611 @@ In this example, we will have:
 
 ### 4 Objective: Minimize makespan (total completion time) and penalties.
 
-"""""
-
-from z3 import *
-
-# Parameters
-n_activities = 5
-n_machines = 3  # Number of machines
-
-# Task durations and time windows
-durations = [2, 3, 4, 1, 5]
-time_windows = [(0, 5), (2, 7), (3, 7), (1, 8), (4, 9)]
-
-# Variables: when tasks start, when they end, and the machines assigned
-start_times = [Int(f'start_{i}') for i in range(n_activities)]
-end_times = [Int(f'end_{i}') for i in range(n_activities)]
-machines = [Int(f'machines_{i}') for i in range(n_activities)]
-
-# Create the solver
-opt = Optimize()
-
-# Constraints: time windows (tasks must start and finish within their window)
-for i in range(n_activities):
-    min_time, max_time = time_windows[i]
-
-    # Ensure the task starts and ends within its time window
-    opt.add(start_times[i] >= min_time)
-    opt.add(end_times[i] <= max_time)
-
-    # Ensure end time is the start time plus duration
-    opt.add(end_times[i] == start_times[i] + durations[i])
-
-# Machine constraints: Each machine can only perform one task at a time
-for i in range(n_activities):
-    for j in range(i + 1, n_activities):  # Compare each task only once
-        # Ensure that tasks assigned to the same machine do not overlap
-        opt.add(Implies(machines[i] == machines[j],
-                        Or(end_times[i] <= start_times[j], end_times[j] <= start_times[i])))
-
-# Ensure that machine indices are within valid range (0 to n_machines-1)
-for i in range(n_activities):
-    opt.add(And(machines[i] >= 0, machines[i] < n_machines))
-
-# Solve the problem
-if opt.check() == sat:
-    model = opt.model()
-
-    # Evaluate the variables and print results
-    start_vals = [model.evaluate(start_times[i]).as_long() for i in range(n_activities)]
-    end_vals = [model.evaluate(end_times[i]).as_long() for i in range(n_activities)]
-    machine_vals = [model.evaluate(machines[i]).as_long() for i in range(n_activities)]
-
-    print("Start times:", start_vals) # Start times: [0, 2, 3, 1, 4]
-    print("End times:", end_vals) # End times: [2, 5, 7, 2, 9]
-    print("Assigned machines:", machine_vals) # Assigned machines: [2, 1, 2, 1, 0]
-
-else:
-    print("No solution found!")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
+                        ### Modes ###
 
+### "bisection" One incremental Solver: every probe "makespan <= C" is
+                asserted behind an assumption literal, so the clauses
+                learned by one probe are reused by the next ones, and C
+                is bisected between a lower bound and the best schedule.
 
+### "optimize"  Optimize.minimize(makespan) on the same model.
 
+### "lns"       Large neighbourhood search for days too big for the full model:
+                a greedy list schedule (earliest due time first) is improved
+                by freeing a few tasks at a time, at random or around a point
+                in time, and re-optimizing only those with Z3 while the others
+                stay where they are. Tasks ending after their window are
+                allowed while searching and cost a tardiness penalty, which is
+                minimized before the makespan. Never proves optimality.
 
 
+                        ### Model size ###
 
+Only pairs of tasks whose time windows overlap can collide on a machine,
+so the no-overlap constraints are emitted for those pairs only, found by
+a sweep over the windows sorted by earliest start. The machines are
+identical, so their labels are fixed by value precedence: the first task
+runs on machine 0 and every other task either reuses a machine already
+opened by an earlier task or opens the next one.
 
 
+                        ### Encodings ###
 
+### "disjunctive" Integer start times with a no-overlap disjunction for
+                  every pair of tasks that can collide (build_model()).
 
+### "time"        Time-indexed Booleans: "task i starts at time t", one
+                  PbEq per task and an AtMost per time slot allowing no
+                  more running tasks than machines (build_time_indexed()).
+                  Identical machines make the machine index unnecessary:
+                  tasks that never exceed the capacity of a slot can always
+                  be spread over the machines afterwards (interval colouring).
 
+choose_encoding() picks one from the number of tasks, the horizon and the
+size of the time-indexed model, with thresholds measured by makespanTime.py.
 
+"""""
 
+import itertools
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
+from z3 import *
 
+# Ways of minimizing the makespan, see minimize_makespan()
+MODES = ("bisection", "optimize", "lns")
+
+# Ways of encoding the schedule, see choose_encoding()
+ENCODINGS = ("disjunctive", "time")
+
+# Limits of choose_encoding(), measured by makespanTime.benchmark_encodings():
+# few tasks over a long horizon are faster as disjunctions, and past a few
+# million capacity terms the time-indexed model is too big to solve
+SMALL_INSTANCE_TASKS = 30
+SMALL_INSTANCE_MAX_HORIZON = 200
+TIME_INDEXED_MAX_TERMS = 2000000
+
+# Ways of choosing the tasks freed by one step of lns()
+NEIGHBOURHOODS = ("random", "time")
+
+
+def overlapping_pairs(time_windows):
+    """
+    Finds the pairs of tasks whose time windows overlap, the only ones that can collide.
+
+    Args:
+        time_windows (list of tuples): (earliest start, latest end) of every task.
+
+    Returns:
+        list of tuples: Pairs (i, j) with i < j, sorted.
+    """
+    pairs = []
+    active = []  # Tasks whose window is still open, as (latest end, task)
+    for i in sorted(range(len(time_windows)), key=lambda i: time_windows[i]):
+        min_time = time_windows[i][0]
+        # Windows that close before this one opens can never overlap it again
+        active = [(max_time, j) for max_time, j in active if max_time > min_time]
+        pairs.extend((min(i, j), max(i, j)) for _, j in active)
+        active.append((time_windows[i][1], i))
+    return sorted(pairs)
+
+
+def build_model(solver, durations, time_windows, n_machines, symmetry=True):
+    """
+    Adds the scheduling constraints to a solver.
+
+    Args:
+        solver (Solver or Optimize): Where the constraints are added.
+        durations (list): Duration of every task.
+        time_windows (list of tuples): (earliest start, latest end) of every task.
+        n_machines (int): Number of identical machines.
+        symmetry (bool): Break the symmetry between machine labels.
+
+    Returns:
+        tuple: The start, end and machine variables of the tasks and the makespan variable.
+    """
+    n_activities = len(durations)
+
+    # Variables: when tasks start, when they end, and the machines assigned
+    start_times = [Int(f'start_{i}') for i in range(n_activities)]
+    end_times = [Int(f'end_{i}') for i in range(n_activities)]
+    machines = [Int(f'machines_{i}') for i in range(n_activities)]
+    makespan = Int('makespan')
+
+    # Constraints: time windows (tasks must start and finish within their window)
+    for i in range(n_activities):
+        min_time, max_time = time_windows[i]
+
+        # Ensure the task starts and ends within its time window
+        solver.add(start_times[i] >= min_time)
+        solver.add(end_times[i] <= max_time)
+
+        # Ensure end time is the start time plus duration
+        solver.add(end_times[i] == start_times[i] + durations[i])
+
+        # The makespan is the end of the last task
+        solver.add(makespan >= end_times[i])
+
+    # Machine constraints: Each machine can only perform one task at a time
+    for i, j in overlapping_pairs(time_windows):  # Only tasks whose windows overlap
+        # Ensure that tasks assigned to the same machine do not overlap
+        solver.add(Implies(machines[i] == machines[j],
+                           Or(end_times[i] <= start_times[j], end_times[j] <= start_times[i])))
+
+    # Ensure that machine indices are within valid range (0 to n_machines-1)
+    for i in range(n_activities):
+        solver.add(And(machines[i] >= 0, machines[i] < n_machines))
+
+    # Value precedence: a task opens at most the machine after the highest one used so far
+    if symmetry and n_activities:
+        order = sorted(range(n_activities), key=lambda i: time_windows[i])
+        # opened[k] is the highest machine used by the first k + 1 tasks in window order
+        opened = [Int(f'opened_{k}') for k in range(n_activities)]
+        solver.add(machines[order[0]] == 0, opened[0] == 0)
+        for k in range(1, n_activities):
+            i = order[k]
+            solver.add(machines[i] <= opened[k - 1] + 1)
+            solver.add(opened[k] == If(machines[i] > opened[k - 1], machines[i], opened[k - 1]))
+
+    return start_times, end_times, machines, makespan
+
+
+def read_schedule(model, start_times, end_times, machines):
+    """Evaluates the start times, end times and machines of the tasks in a model."""
+    start_vals = [model.evaluate(start).as_long() for start in start_times]
+    end_vals = [model.evaluate(end).as_long() for end in end_times]
+    machine_vals = [model.evaluate(machine).as_long() for machine in machines]
+    return start_vals, end_vals, machine_vals
+
+
+def is_valid_schedule(schedule, durations, time_windows, n_machines, allow_late=False):
+    """
+    Checks in plain Python that a schedule respects the windows and never overlaps two tasks on a machine.
+    With allow_late, tasks may end after their window (see tardiness()).
+    """
+    start_vals, end_vals, machine_vals = schedule
+    for i, duration in enumerate(durations):
+        if (end_vals[i] != start_vals[i] + duration or start_vals[i] < time_windows[i][0] or
+                (end_vals[i] > time_windows[i][1] and not allow_late) or
+                not 0 <= machine_vals[i] < n_machines):
+            return False
+    for machine in range(n_machines):
+        tasks = sorted((start_vals[i], end_vals[i]) for i in range(len(durations)) if machine_vals[i] == machine)
+        if any(tasks[k][1] > tasks[k + 1][0] for k in range(len(tasks) - 1)):
+            return False
+    return True
+
+
+def _start_domains(durations, time_windows):
+    """Every start time allowed by the window of each task."""
+    return [range(window[0], window[1] - duration + 1) for duration, window in zip(durations, time_windows)]
+
+
+def assign_machines(start_vals, end_vals, n_machines):
+    """
+    Spreads tasks over identical machines, each task on the lowest machine free at its start.
+
+    Returns:
+        list: The machine of every task, or None if more than n_machines tasks run at once.
+    """
+    machine_vals = [0] * len(start_vals)
+    free_at = [0] * n_machines
+    for i in sorted(range(len(start_vals)), key=start_vals.__getitem__):
+        machine = next((k for k in range(n_machines) if free_at[k] <= start_vals[i]), None)
+        if machine is None:
+            return None
+        machine_vals[i] = machine
+        free_at[machine] = end_vals[i]
+    return machine_vals
+
+
+def build_time_indexed(solver, durations, time_windows, n_machines):
+    """
+    Adds the time-indexed scheduling constraints to a solver.
+
+    Args:
+        solver (Solver or Optimize): Where the constraints are added.
+        durations (list): Duration of every task.
+        time_windows (list of tuples): (earliest start, latest end) of every task.
+        n_machines (int): Number of identical machines.
+
+    Returns:
+        tuple: A function reading the schedule from a model, and the makespan variable.
+    """
+    domains = _start_domains(durations, time_windows)
+    makespan = Int('makespan')
+
+    # starts_at[i][t] is true if task i starts at time t
+    starts_at = [{t: Bool(f'starts_{i}_{t}') for t in domain} for i, domain in enumerate(domains)]
+
+    running = {}  # Start literals of the tasks running during every time slot
+    for i, duration in enumerate(durations):
+        if not starts_at[i]:
+            # No start fits in the window
+            solver.add(BoolVal(False))
+            continue
+        # Every task starts exactly once
+        solver.add(PbEq([(literal, 1) for literal in starts_at[i].values()], 1))
+        for t, literal in starts_at[i].items():
+            solver.add(Implies(literal, makespan >= t + duration))
+            for slot in range(t, t + duration):
+                running.setdefault(slot, []).append(literal)
+
+    # No more running tasks than machines in any time slot
+    for literals in running.values():
+        if len(literals) > n_machines:
+            solver.add(AtMost(*literals, n_machines))
+
+    def read(model):
+        start_vals = [next(t for t, literal in starts_at[i].items() if is_true(model.evaluate(literal)))
+                      for i in range(len(durations))]
+        end_vals = [start + duration for start, duration in zip(start_vals, durations)]
+        return start_vals, end_vals, assign_machines(start_vals, end_vals, n_machines)
+
+    return read, makespan
+
+
+def time_indexed_terms(durations, time_windows):
+    """Number of literals in the capacity constraints of the time-indexed encoding."""
+    return sum(len(domain) * duration for domain, duration in zip(_start_domains(durations, time_windows), durations))
+
+
+def choose_encoding(durations, time_windows, n_machines):
+    """
+    Picks the encoding expected to solve an instance faster: time-indexed, unless there
+    are few tasks over a long horizon or the time-indexed model would be too big.
+    """
+    if not durations:
+        return "disjunctive"
+    horizon = max(window[1] for window in time_windows) - min(window[0] for window in time_windows)
+    if len(durations) <= SMALL_INSTANCE_TASKS and horizon > SMALL_INSTANCE_MAX_HORIZON:
+        return "disjunctive"
+    if time_indexed_terms(durations, time_windows) > TIME_INDEXED_MAX_TERMS:
+        return "disjunctive"
+    return "time"
+
+
+def makespan_lower_bound(durations, time_windows, n_machines):
+    """
+    A makespan no schedule can beat: every task ends after its earliest start plus
+    its duration, and the machines cannot share the total work better than evenly.
+    """
+    if not durations:
+        return 0
+    last_ready = max(window[0] + duration for window, duration in zip(time_windows, durations))
+    first_start = min(window[0] for window in time_windows)
+    return max(last_ready, first_start + -(-sum(durations) // n_machines))
+
+
+def _bisect(solver, read, makespan, lower_bound, deadline):
+    """
+    Bisects the makespan between the bounds on an incremental solver, yielding every improvement.
+
+    Each probe "makespan <= target" is asserted behind its own literal and passed
+    as an assumption, so a failed probe leaves nothing behind but learned clauses.
+    """
+    def set_timeout():
+        if deadline is None:
+            solver.set("timeout", 4294967295)
+            return True
+        remaining = deadline - time.monotonic()
+        solver.set("timeout", max(1, int(remaining * 1000)))
+        return remaining > 0
+
+    # Any schedule gives the first upper bound
+    set_timeout()
+    result = solver.check()
+    if result != sat:
+        return
+    schedule = read(solver.model())
+    best = max(schedule[1], default=0)
+    yield schedule, best, lower_bound
+
+    while lower_bound < best and set_timeout():
+        target = (lower_bound + best) // 2
+        below_target = Bool(f'cmax_below_{target}')
+        solver.add(Implies(below_target, makespan <= target))
+        result = solver.check(below_target)
+
+        if result == sat:
+            schedule = read(solver.model())
+            best = max(schedule[1])
+        elif result == unsat:
+            # No schedule ends that early: the lower bound is proven
+            lower_bound = target + 1
+            solver.add(makespan >= lower_bound)
+        else:
+            break
+        yield schedule, best, lower_bound
+
+
+def tardiness(schedule, time_windows):
+    """Total time by which the tasks of a schedule end after their window."""
+    return sum(max(0, end - window[1]) for end, window in zip(schedule[1], time_windows))
+
+
+def list_schedule(durations, time_windows, n_machines):
+    """
+    Greedy schedule: the tasks are taken by earliest due time (end of their window)
+    and each one starts as soon as possible, on the machine that leaves the
+    shortest idle gap before it. Tasks may end after their window.
+
+    Returns:
+        tuple: The schedule as (start times, end times, machines).
+    """
+    n_activities = len(durations)
+    start_vals, end_vals, machine_vals = [0] * n_activities, [0] * n_activities, [0] * n_activities
+    free_at = [0] * n_machines
+    for i in sorted(range(n_activities), key=lambda i: (time_windows[i][1], time_windows[i][0])):
+        ready = time_windows[i][0]
+        machine = min(range(n_machines), key=lambda k: (max(free_at[k], ready), -free_at[k]))
+        start_vals[i] = max(free_at[machine], ready)
+        end_vals[i] = free_at[machine] = start_vals[i] + durations[i]
+        machine_vals[i] = machine
+    return start_vals, end_vals, machine_vals
+
+
+def _neighbourhood(schedule, time_windows, kind, size, rng):
+    """Chooses the tasks freed by one step of lns()."""
+    start_vals, end_vals, _ = schedule
+    n_activities = len(start_vals)
+    if kind == "random":
+        return rng.sample(range(n_activities), min(size, n_activities))
+
+    # Time slice around a pivot, half of the times a late task or one ending last
+    late = [i for i in range(n_activities) if end_vals[i] > time_windows[i][1]]
+    critical = late or [i for i in range(n_activities) if end_vals[i] == max(end_vals)]
+    pivot = rng.choice(critical) if rng.random() < 0.5 else rng.randrange(n_activities)
+    return sorted(range(n_activities), key=lambda i: abs(start_vals[i] - start_vals[pivot]))[:size]
+
+
+def _repair(durations, time_windows, n_machines, schedule, free, timeout_ms):
+    """
+    Re-optimizes the free tasks of a schedule with the other tasks fixed,
+    minimizing first their tardiness and then the makespan.
+
+    Returns:
+        tuple: The new schedule, or None if Z3 found nothing in time.
+    """
+    start_vals, end_vals, machine_vals = schedule
+    free_set = set(free)
+
+    # Intervals already taken on every machine by the fixed tasks
+    busy = [[] for _ in range(n_machines)]
+    for j in range(len(durations)):
+        if j not in free_set:
+            busy[machine_vals[j]].append((start_vals[j], end_vals[j]))
+    fixed_end = max((end_vals[j] for j in range(len(durations)) if j not in free_set), default=0)
+
+    opt = Optimize()
+    opt.set("timeout", timeout_ms)
+    start = {i: Int(f'start_{i}') for i in free}
+    end = {i: Int(f'end_{i}') for i in free}
+    machine = {i: Int(f'machines_{i}') for i in free}
+    late = {i: Int(f'late_{i}') for i in free}
+    makespan = Int('makespan')
+
+    opt.add(makespan >= fixed_end)
+    for i in free:
+        min_time, max_time = time_windows[i]
+        opt.add(start[i] >= min_time, end[i] == start[i] + durations[i])
+        opt.add(late[i] >= 0, end[i] <= max_time + late[i])
+        opt.add(machine[i] >= 0, machine[i] < n_machines, makespan >= end[i])
+        # Fit between the fixed tasks of the chosen machine
+        for k in range(n_machines):
+            for busy_start, busy_end in busy[k]:
+                if busy_end > min_time:
+                    opt.add(Implies(machine[i] == k, Or(end[i] <= busy_start, start[i] >= busy_end)))
+        opt.set_initial_value(start[i], start_vals[i])
+        opt.set_initial_value(machine[i], machine_vals[i])
+    for i, j in itertools.combinations(free, 2):
+        opt.add(Implies(machine[i] == machine[j], Or(end[i] <= start[j], end[j] <= start[i])))
+
+    # Lexicographic objectives: tardiness first, then makespan
+    opt.minimize(Sum([late[i] for i in free]))
+    opt.minimize(makespan)
+    if opt.check() == unsat:
+        return None
+    try:
+        model = opt.model()
+        new_start, new_end, new_machine = list(start_vals), list(end_vals), list(machine_vals)
+        for i in free:
+            new_start[i] = model.evaluate(start[i]).as_long()
+            new_end[i] = model.evaluate(end[i]).as_long()
+            new_machine[i] = model.evaluate(machine[i]).as_long()
+    except (Z3Exception, AttributeError):
+        return None
+    repaired = new_start, new_end, new_machine
+    # On timeout the model may be partial: keep it only if it is a real schedule
+    if not is_valid_schedule(repaired, durations, time_windows, n_machines, allow_late=True):
+        return None
+    return repaired
+
+
+def lns(durations, time_windows, n_machines, timeout_ms=10000, size=10, neighbourhoods=NEIGHBOURHOODS,
+        workers=0, repair_timeout_ms=1000, seed=0):
+    """
+    Large neighbourhood search from a greedy list schedule, yielding every improvement.
+
+    Args:
+        durations (list): Duration of every task.
+        time_windows (list of tuples): (earliest start, latest end) of every task.
+        n_machines (int): Number of identical machines.
+        timeout_ms (int): Wall-clock budget in milliseconds.
+        size (int): Number of tasks freed by each step.
+        neighbourhoods (tuple): Kinds of steps, see NEIGHBOURHOODS.
+        workers (int): Worker processes repairing different neighbourhoods at the same time;
+            0 repairs them one after the other in this process.
+        repair_timeout_ms (int): Z3 budget of every step in milliseconds.
+        seed (int): Seed of the random choices.
+
+    Yields:
+        tuple: A schedule, its makespan and its tardiness, better than the previous ones
+        (lower tardiness, or same tardiness and lower makespan).
+    """
+    deadline = time.monotonic() + timeout_ms / 1000
+    rng = random.Random(seed)
+    lower_bound = makespan_lower_bound(durations, time_windows, n_machines)
+    if not durations:
+        return
+
+    def cost(schedule):
+        return tardiness(schedule, time_windows), max(schedule[1])
+
+    best = list_schedule(durations, time_windows, n_machines)
+    best_cost = cost(best)
+    yield best, best_cost[1], best_cost[0]
+
+    def step_args():
+        free = _neighbourhood(best, time_windows, rng.choice(neighbourhoods), size, rng)
+        step_timeout = min(repair_timeout_ms, max(1, int((deadline - time.monotonic()) * 1000)))
+        return durations, time_windows, n_machines, best, free, step_timeout
+
+    def searching():
+        return time.monotonic() < deadline and best_cost > (0, lower_bound)
+
+    if workers == 0:
+        while searching():
+            repaired = _repair(*step_args())
+            # Moves that are not worse are kept too, so the search can drift off plateaus
+            if repaired is not None and cost(repaired) <= best_cost:
+                improved = cost(repaired) < best_cost
+                best, best_cost = repaired, cost(repaired)
+                if improved:
+                    yield best, best_cost[1], best_cost[0]
+        return
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(_repair, *step_args()) for _ in range(workers)}
+        while pending and searching():
+            done, pending = wait(pending, timeout=deadline - time.monotonic(), return_when=FIRST_COMPLETED)
+            for future in done:
+                # A step may start from an older schedule: its result is still a whole schedule
+                repaired = future.result()
+                if repaired is not None and cost(repaired) <= best_cost:
+                    improved = cost(repaired) < best_cost
+                    best, best_cost = repaired, cost(repaired)
+                    if improved:
+                        yield best, best_cost[1], best_cost[0]
+            if searching():
+                pending |= {pool.submit(_repair, *step_args()) for _ in done}
+    finally:
+        # Running steps end within repair_timeout_ms, queued ones are dropped
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _encode(solver, durations, time_windows, n_machines, encoding):
+    """Adds the model in the given encoding, returning a schedule reader and the makespan variable."""
+    if encoding == "time":
+        return build_time_indexed(solver, durations, time_windows, n_machines)
+    start_times, end_times, machines, makespan = build_model(solver, durations, time_windows, n_machines)
+    return (lambda model: read_schedule(model, start_times, end_times, machines)), makespan
+
+
+def minimize_makespan(durations, time_windows, n_machines, mode="bisection", timeout_ms=None,
+                      callback=None, return_bound=False, workers=0, encoding="auto"):
+    """
+    Finds a schedule of the tasks on the machines that ends as early as possible.
+
+    Args:
+        durations (list): Duration of every task.
+        time_windows (list of tuples): (earliest start, latest end) of every task.
+        n_machines (int): Number of identical machines.
+        mode (str): One of MODES.
+        timeout_ms (int): Optional wall-clock budget in milliseconds, the best
+            schedule found in time is returned ("lns" always stops, after 10 seconds by default).
+        callback (callable): Optional function called as callback(schedule, makespan, lower_bound)
+            every time a better schedule or a better lower bound is found
+            (only once, at the end, in "optimize" mode).
+        return_bound (bool): Also return the best lower bound, equal to the makespan
+            when the schedule is proven optimal.
+        workers (int): Worker processes of the "lns" mode, see lns().
+        encoding (str): One of ENCODINGS for the "bisection" and "optimize" modes,
+            or "auto" to let choose_encoding() pick one.
+
+    Returns:
+        tuple: The schedule as (start times, end times, machines) and its makespan
+        (and its lower bound if return_bound is set).
+        tuple: (None, None) if no schedule fits the time windows or none was found in time.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}, expected one of {MODES}")
+    if encoding == "auto":
+        encoding = choose_encoding(durations, time_windows, n_machines)
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {encoding!r}, expected one of {ENCODINGS} or 'auto'")
+
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    lower_bound = makespan_lower_bound(durations, time_windows, n_machines)
+    schedule, best = None, None
+
+    if mode == "optimize":
+        opt = Optimize()
+        read, makespan = _encode(opt, durations, time_windows, n_machines, encoding)
+        opt.add(makespan >= lower_bound)
+        opt.minimize(makespan)
+        if timeout_ms is not None:
+            opt.set("timeout", timeout_ms)
+        result = opt.check()
+        # On timeout the optimizer may still hold the best schedule found so far
+        if result != unsat:
+            try:
+                schedule = read(opt.model())
+            except (Z3Exception, AttributeError, StopIteration):
+                schedule = None
+            if (schedule is not None and schedule[2] is not None and
+                    is_valid_schedule(schedule, durations, time_windows, n_machines)):
+                best = max(schedule[1], default=0)
+            else:
+                schedule = None
+        if result == sat:
+            lower_bound = best
+        if callback is not None and schedule is not None:
+            callback(schedule, best, lower_bound)
+    elif mode == "lns":
+        for found, makespan, late in lns(durations, time_windows, n_machines,
+                                         10000 if timeout_ms is None else timeout_ms, workers=workers):
+            # Only schedules that respect every window count
+            if late == 0:
+                schedule, best = found, makespan
+                if callback is not None:
+                    callback(schedule, best, lower_bound)
+    else:
+        solver = Solver()
+        read, makespan = _encode(solver, durations, time_windows, n_machines, encoding)
+        solver.add(makespan >= lower_bound)
+        for schedule, best, lower_bound in _bisect(solver, read, makespan, lower_bound, deadline):
+            if callback is not None and schedule is not None:
+                callback(schedule, best, lower_bound)
+
+    if return_bound:
+        return schedule, best, lower_bound
+    return schedule, best
+
+
+# Example usage
+if __name__ == "__main__":
+    # Parameters
+    n_machines = 3  # Number of machines
+
+    # Task durations and time windows
+    durations = [2, 3, 4, 1, 5]
+    time_windows = [(0, 5), (2, 7), (3, 7), (1, 8), (4, 9)]
+
+    # Solve the problem
+    schedule, makespan = minimize_makespan(durations, time_windows, n_machines)
+    if schedule is not None:
+        start_vals, end_vals, machine_vals = schedule
+
+        print("Start times:", start_vals)
+        print("End times:", end_vals)
+        print("Assigned machines:", machine_vals)
+        print("Makespan:", makespan)
+
+    else:
+        print("No solution found!")
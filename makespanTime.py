@@ -0,0 +1,227 @@
+"""""
+            ### Scheduling Problem, makespan benchmark ###
+
+Compares the modes of makespan.py on random instances of growing size,
+measuring the time needed to build and solve the model, the peak memory
+of the process and the makespan reached within the timeout.
+
+Every case runs in a fresh process so that the peak memory of one mode
+does not leak into the next one.
+
+"""""
+
+import multiprocessing
+import random
+import resource
+import sys
+import time
+
+from makespan import (ENCODINGS, MODES, choose_encoding, lns, makespan_lower_bound, minimize_makespan,
+                      overlapping_pairs, time_indexed_terms)
+
+
+def random_instance(n_tasks, n_machines=None, seed=0, slack=15, balanced=True):
+    """
+    Creates a random instance that is known to have a schedule.
+
+    A random schedule is built first, placing every task on the machine that
+    frees up first (or on a random one), then every time window is widened
+    around it by a random slack.
+
+    Args:
+        n_tasks (int): Number of tasks.
+        n_machines (int): Number of machines, by default one every ten tasks (at least two).
+        seed (int): Seed of the random generator, so that runs are reproducible.
+        slack (int): Largest widening of each side of a time window.
+        balanced (bool): Place the tasks of the hidden schedule on the machine that frees up first,
+            otherwise on a random machine, which leaves a makespan far from the lower bound.
+
+    Returns:
+        tuple: The durations, the time windows and the number of machines.
+    """
+    rng = random.Random(seed)
+    if n_machines is None:
+        n_machines = max(2, n_tasks // 10)
+    durations = [rng.randint(1, 10) for _ in range(n_tasks)]
+
+    free_at = [0] * n_machines
+    time_windows = []
+    for duration in durations:
+        if balanced:
+            machine = min(range(n_machines), key=free_at.__getitem__)
+        else:
+            machine = rng.randrange(n_machines)
+        start = free_at[machine] + rng.randint(0, 3)
+        free_at[machine] = start + duration
+        time_windows.append((max(0, start - rng.randint(0, slack)), start + duration + rng.randint(0, slack)))
+    return durations, time_windows, n_machines
+
+
+def peak_memory_mb():
+    """Peak resident memory of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(n_tasks, mode, timeout_ms, seed):
+    """Solves one instance, returning its measurements."""
+    durations, time_windows, n_machines = random_instance(n_tasks, seed=seed)
+    base_memory = peak_memory_mb()
+
+    # Time until the first schedule, to compare how soon each mode has an answer
+    first = []
+    start_time = time.perf_counter()
+    schedule, makespan, lower_bound = minimize_makespan(
+        durations, time_windows, n_machines, mode, timeout_ms,
+        callback=lambda *_: first or first.append(time.perf_counter() - start_time),
+        return_bound=True)
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        "n": n_tasks,
+        "machines": n_machines,
+        "pairs": len(overlapping_pairs(time_windows)),
+        "mode": mode,
+        "time_s": elapsed,
+        "first_s": first[0] if first else None,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "makespan": makespan,
+        "lower_bound": lower_bound,
+        "optimal": makespan is not None and makespan == lower_bound,
+    }
+
+
+def run_isolated(func, *args):
+    """Runs func(*args) in a fresh process and returns its result."""
+    with multiprocessing.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def benchmark(sizes=(20, 50, 100, 200), modes=MODES, timeout_ms=60000, seed=0):
+    """
+    Runs every mode on every instance size.
+
+    Args:
+        sizes (tuple): Number of tasks of the instances.
+        modes (tuple): Modes of makespan.py to compare.
+        timeout_ms (int): Wall-clock budget of each case in milliseconds.
+        seed (int): Seed used to generate the instances.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_tasks in sizes:
+        for mode in modes:
+            row = run_isolated(_run_case, n_tasks, mode, timeout_ms, seed)
+            first = "-" if row["first_s"] is None else f"{row['first_s']:.3f}s"
+            print(f"n={row['n']:<4} machines {row['machines']:<3} pairs {row['pairs']:<6} {row['mode']:<10} "
+                  f"time {row['time_s']:8.3f}s  first {first:>8}  peak {row['peak_mb']:8.1f}MB  "
+                  f"makespan {row['makespan']} (bound {row['lower_bound']}, "
+                  f"{'optimal' if row['optimal'] else 'not proven'})")
+            rows.append(row)
+    return rows
+
+
+def scaled_instance(n_tasks, scale, seed=0):
+    """A random_instance() with durations and windows stretched by scale, so the horizon grows alone."""
+    durations, time_windows, n_machines = random_instance(n_tasks, seed=seed)
+    return ([duration * scale for duration in durations],
+            [(min_time * scale, max_time * scale) for min_time, max_time in time_windows], n_machines)
+
+
+def _run_encoding(n_tasks, scale, encoding, timeout_ms, seed):
+    """Solves one stretched instance in one encoding, returning its measurements."""
+    durations, time_windows, n_machines = scaled_instance(n_tasks, scale, seed)
+    base_memory = peak_memory_mb()
+    start_time = time.perf_counter()
+    schedule, makespan, lower_bound = minimize_makespan(durations, time_windows, n_machines, "bisection",
+                                                        timeout_ms, return_bound=True, encoding=encoding)
+    return {
+        "n": n_tasks,
+        "horizon": max(window[1] for window in time_windows) - min(window[0] for window in time_windows),
+        "terms": time_indexed_terms(durations, time_windows),
+        "encoding": encoding,
+        "chosen": choose_encoding(durations, time_windows, n_machines),
+        "time_s": time.perf_counter() - start_time,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "makespan": makespan,
+        "optimal": makespan is not None and makespan == lower_bound,
+    }
+
+
+def benchmark_encodings(sizes=(20, 50, 100, 200, 500), scales=(1, 2, 4, 8), encodings=ENCODINGS,
+                        timeout_ms=30000, seed=0):
+    """
+    Compares the disjunctive and time-indexed encodings as the tasks and the horizon grow,
+    the measurements behind the thresholds of choose_encoding().
+
+    Args:
+        sizes (tuple): Number of tasks of the instances.
+        scales (tuple): Factors stretching durations and windows, and so the horizon.
+        encodings (tuple): Encodings of makespan.py to compare.
+        timeout_ms (int): Wall-clock budget of each case in milliseconds.
+        seed (int): Seed used to generate the instances.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_tasks in sizes:
+        for scale in scales:
+            for encoding in encodings:
+                row = run_isolated(_run_encoding, n_tasks, scale, encoding, timeout_ms, seed)
+                print(f"n={row['n']:<4} horizon {row['horizon']:<5} terms {row['terms']:<8} "
+                      f"{row['encoding']:<12} time {row['time_s']:8.3f}s  peak {row['peak_mb']:8.1f}MB  "
+                      f"makespan {row['makespan']} ({'optimal' if row['optimal'] else 'not proven'})  "
+                      f"chosen {row['chosen']}")
+                rows.append(row)
+    return rows
+
+
+def benchmark_lns(sizes=(50, 100, 200, 500, 1000), workers=(0, 2), timeout_ms=30000, seed=0):
+    """
+    Follows the large neighbourhood search of makespan.py on instances where the
+    greedy start is far from the lower bound (random machines, wide windows).
+
+    Args:
+        sizes (tuple): Number of tasks of the instances.
+        workers (tuple): Numbers of worker processes to compare (0 runs in this process).
+        timeout_ms (int): Wall-clock budget of each case in milliseconds.
+        seed (int): Seed used to generate the instances.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_tasks in sizes:
+        durations, time_windows, n_machines = random_instance(n_tasks, max(2, n_tasks // 20), seed,
+                                                              slack=300, balanced=False)
+        lower_bound = makespan_lower_bound(durations, time_windows, n_machines)
+        for n_workers in workers:
+            start_time = time.perf_counter()
+            steps = []
+            for _, makespan, late in lns(durations, time_windows, n_machines, timeout_ms, workers=n_workers):
+                steps.append((time.perf_counter() - start_time, late, makespan))
+            print(f"n={n_tasks:<5} machines {n_machines:<3} workers {n_workers:<3} bound {lower_bound:<5} "
+                  f"greedy (late {steps[0][1]}, makespan {steps[0][2]}) -> "
+                  f"(late {steps[-1][1]}, makespan {steps[-1][2]}) at {steps[-1][0]:.2f}s "
+                  f"after {len(steps) - 1} improvements")
+            rows.append({"n": n_tasks, "machines": n_machines, "workers": n_workers,
+                         "lower_bound": lower_bound, "steps": steps})
+    return rows
+
+
+# Example usage
+if __name__ == "__main__":
+    if "encodings" in sys.argv[1:]:
+        # Disjunctive against time-indexed encoding: python makespanTime.py encodings
+        benchmark_encodings()
+    elif "lns" in sys.argv[1:]:
+        # Large neighbourhood search on harder instances: python makespanTime.py lns
+        benchmark_lns()
+    else:
+        # Wall-clock budget per case can be passed on the command line (in seconds)
+        timeout_s = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+        benchmark(timeout_ms=timeout_s * 1000)
@@ -0,0 +1,428 @@
+"""""
+            ### Traveling Salesman Problem plus, TSP+ ###
+
+The solver behind TSP+.py, in a module that can be imported (and whose
+workers can be pickled by a process pool):
+
+route()            the shortest route of one salesperson, on the arcs
+                   left by feasible_arcs();
+vrp()              several salespeople, assigned by assign_customers()
+                   and routed in parallel;
+solve_tsp_plus()   one instance given as a dictionary (as read from JSON);
+solve_stream()     a stream of JSON-lines instances over a process pool.
+
+"""""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from z3 import *
+import json
+import os
+import time
+
+
+def feasible_arcs(time_windows, travel_times, demands, capacity, supply_points):
+    """
+    Builds the sparse index of the arcs that a feasible route can use.
+
+    An arc (a, b) towards a city other than the depot 0 is dead if:
+    - leaving a at the earliest, b is reached after its time window closes;
+    - b is not a supply point and the demands of a and b together exceed the capacity
+      (the load of a is still on board when serving b).
+    Removing arcs can tighten the windows (a city can only be reached through live
+    arcs), so the two steps are repeated until nothing changes. Latest departures
+    give nothing to tighten: the route may always close from any city back to the
+    depot, which has no window to check on the way back.
+
+    Args:
+        time_windows (list of tuples): Earliest and latest visit time of each city.
+        travel_times (list of lists): Time needed to travel between each pair of cities.
+        demands (list): Resources requested by each city.
+        capacity (int): Maximum resources carried by the salesperson.
+        supply_points (list): Cities where the salesperson recharges the capacity.
+
+    Returns:
+        tuple: The live successors of each city (a dict of lists) and the tightened time windows.
+    """
+    n_city = len(time_windows)
+    supply = set(supply_points)
+    windows = list(time_windows)
+    arcs = {a: [b for b in range(n_city) if b != a] for a in range(n_city)}
+
+    changed = True
+    while changed:
+        changed = False
+        for a in range(n_city):
+            live = []
+            for b in arcs[a]:
+                # Going back to the depot closes the route: no window and no load to check
+                if b != 0:
+                    if windows[a][0] + travel_times[a][b] > windows[b][1]:
+                        continue
+                    if b not in supply and demands[a] + demands[b] > capacity:
+                        continue
+                live.append(b)
+            changed |= len(live) != len(arcs[a])
+            arcs[a] = live
+
+        # Earliest arrival through live arcs
+        for b in range(1, n_city):
+            preds = [a for a in range(n_city) if b in arcs[a]]
+            earliest = min((windows[a][0] + travel_times[a][b] for a in preds), default=windows[b][1] + 1)
+            window = (max(windows[b][0], earliest), windows[b][1])
+            if window != windows[b]:
+                windows[b] = window
+                changed = True
+
+    return arcs, windows
+
+
+def _solve_route(customers, distances, demands, time_windows, travel_times, capacity,
+                 supply_points=(0,), timeout_ms=None, verbose=False):
+    """Finds the route of route(), also telling apart proven infeasibility ("unsat") and timeouts."""
+    deadline = None if timeout_ms is None else time.monotonic() + timeout_ms / 1000
+    if not customers:
+        return ([0], {0: time_windows[0][0]}, {0: 0}, 0), "sat"
+
+    # Work on the sub-instance made of the depot and the customers
+    cities = [0] + list(customers)
+    n_city = len(cities)
+    sub = lambda matrix: [[matrix[a][b] for b in cities] for a in cities]
+    sub_distances, sub_travel = sub(distances), sub(travel_times)
+    sub_demands = [demands[c] for c in cities]
+    sub_supply = [i for i, c in enumerate(cities) if c in supply_points or c == 0]
+
+    # Preprocessing: keep only the arcs that a feasible route can use
+    arcs, windows = feasible_arcs([time_windows[c] for c in cities], sub_travel, sub_demands,
+                                  capacity, sub_supply)
+    if verbose:
+        all_arcs = n_city * (n_city - 1)
+        kept_arcs = sum(len(successors) for successors in arcs.values())
+        print(f"Live arcs (a, b): {kept_arcs} of {all_arcs} ({1 - kept_arcs / all_arcs:.0%} pruned)")
+    if any(not arcs[a] for a in range(n_city)):
+        return None, "unsat"
+
+    solver = Solver()
+
+    # Variables: the city visited after each city, its position, visit time and load
+    next_city = [Int(f'next_{i}') for i in range(n_city)]
+    order = [Int(f'order_{i}') for i in range(n_city)]
+    visit_time = [Int(f'visit_time_{i}') for i in range(n_city)]
+    load_vars = [Int(f'load_{i}') for i in range(n_city)]
+
+    # Every city is left along a live arc and entered once, the route starts from the depot
+    for a in range(n_city):
+        solver.add(Or([next_city[a] == b for b in arcs[a]]))
+    solver.add(Distinct(next_city))
+    solver.add(order[0] == 0, visit_time[0] == windows[0][0], load_vars[0] == 0)
+
+    # Capacity and time window constraints: each city is visited within its (tightened) range
+    for i in range(1, n_city):
+        solver.add(And(order[i] >= 1, order[i] < n_city))
+        solver.add(And(load_vars[i] >= sub_demands[i], load_vars[i] <= capacity))
+        solver.add(And(visit_time[i] >= windows[i][0], visit_time[i] <= windows[i][1]))
+
+    # Time and cumulative load along the route (recharged at supply points)
+    legs = []
+    for a in range(n_city):
+        leg = IntVal(sub_distances[a][arcs[a][-1]])
+        for b in arcs[a]:
+            if b != arcs[a][-1]:
+                leg = If(next_city[a] == b, sub_distances[a][b], leg)
+            if b != 0:
+                solver.add(Implies(next_city[a] == b, And(
+                    order[b] >= order[a] + 1,
+                    visit_time[b] >= visit_time[a] + sub_travel[a][b],
+                    load_vars[b] == (0 if b in sub_supply else load_vars[a]) + sub_demands[b])))
+        legs.append(leg)
+    total_distance = Sum(legs)
+
+    # Minimization of total distance: every route found must be shorter than the previous one
+    best, status = None, "unknown"
+    while True:
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            solver.set("timeout", max(1, int(remaining * 1000)))
+        shorter = [] if best is None else [total_distance < best[3]]
+        result = solver.check(*shorter)
+        if result == unsat:
+            status = "unsat" if best is None else "optimal"
+            break
+        if result != sat:
+            break
+        model = solver.model()
+        successors = [model.evaluate(next_city[i]).as_long() for i in range(n_city)]
+        path = [0]
+        while len(path) < n_city:
+            path.append(successors[path[-1]])
+        times = {cities[i]: model.evaluate(visit_time[i]).as_long() for i in range(n_city)}
+        loads = {cities[i]: model.evaluate(load_vars[i]).as_long() for i in range(n_city)}
+        calc_distance = sum(sub_distances[path[i]][path[(i + 1) % n_city]] for i in range(n_city))
+        best, status = ([cities[i] for i in path], times, loads, calc_distance), "sat"
+    return best, status
+
+
+def route(customers, distances, demands, time_windows, travel_times, capacity,
+          supply_points=(0,), timeout_ms=None, verbose=False):
+    """
+    Finds the shortest route of one salesperson visiting some customers.
+
+    The route starts from the depot 0 at the beginning of its window, the load
+    carried since the last supply point and the arrival time accumulate along it.
+    Every city chooses the next city among its live arcs only.
+
+    Args:
+        customers (list): The cities to visit, the depot 0 excluded.
+        distances (list of lists): A matrix representing distances between cities.
+        demands (list): Resources requested by each city.
+        time_windows (list of tuples): Earliest and latest visit time of each city.
+        travel_times (list of lists): Time needed to travel between each pair of cities.
+        capacity (int): Maximum resources carried by the salesperson.
+        supply_points (list): Cities where the salesperson recharges the capacity.
+        timeout_ms (int): Optional wall-clock budget in milliseconds, the shortest
+            route found in time is returned.
+        verbose (bool): Print how many of the n(n-1) arcs (a, b) survive the preprocessing.
+
+    Returns:
+        tuple: The route (starting from the depot), the visit time and the load of each
+        city of the route (dicts keyed by city) and the total distance.
+        None: If no feasible route exists, or none is found in time.
+    """
+    best, _ = _solve_route(customers, distances, demands, time_windows, travel_times, capacity,
+                           supply_points, timeout_ms, verbose)
+    return best
+
+
+def assign_customers(n_vehicles, distances, demands, capacity, supply_points=(0,),
+                     forbidden=(), timeout_ms=None):
+    """
+    Splits the customers among the salespeople (cluster first, route second).
+
+    Every salesperson gets a seed customer, far from the depot and from the other
+    seeds, and every customer costs what it would add to the route depot-seed-depot.
+    The assignment with the lowest total cost is found with pseudo-boolean constraints.
+
+    Args:
+        n_vehicles (int): Number of salespeople.
+        distances (list of lists): A matrix representing distances between cities.
+        demands (list): Resources requested by each city.
+        capacity (int): Maximum resources carried by each salesperson.
+        supply_points (list): Cities where the salespeople recharge the capacity.
+        forbidden (list): Groups of customers that no salesperson can serve together.
+        timeout_ms (int): Optional solver timeout in milliseconds.
+
+    Returns:
+        list of lists: The customers of each salesperson.
+        None: If no assignment exists.
+    """
+    n_city = len(distances)
+    customers = list(range(1, n_city))
+
+    # Seeds spread out by farthest point sampling, starting from the depot
+    seeds = []
+    gap = list(distances[0])
+    for _ in range(min(n_vehicles, len(customers))):
+        seed = max(customers, key=lambda c: (c not in seeds, gap[c]))
+        seeds.append(seed)
+        gap = [min(gap[j], distances[seed][j]) for j in range(n_city)]
+
+    def cost(c, v):
+        if v >= len(seeds):
+            return distances[0][c] + distances[c][0]
+        s = seeds[v]
+        return min(distances[0][c] + distances[c][s], distances[s][c] + distances[c][0]) - distances[0][s]
+
+    opt = Optimize()
+    if timeout_ms is not None:
+        opt.set("timeout", timeout_ms)
+    serves = {(c, v): Bool(f'serves_{c}_{v}') for c in customers for v in range(n_vehicles)}
+
+    # Every customer is served by exactly one salesperson, seeds by their own
+    for c in customers:
+        opt.add(PbEq([(serves[c, v], 1) for v in range(n_vehicles)], 1))
+    for v, s in enumerate(seeds):
+        opt.add(serves[s, v])
+
+    # Without supply points on the way, the demands of a route must fit in the capacity
+    if set(supply_points) <= {0}:
+        for v in range(n_vehicles):
+            opt.add(PbLe([(serves[c, v], demands[c]) for c in customers], capacity))
+
+    # Groups that turned out to have no feasible route
+    for group in forbidden:
+        for v in range(n_vehicles):
+            opt.add(Or([Not(serves[c, v]) for c in group]))
+
+    opt.minimize(Sum([If(serves[c, v], cost(c, v), 0) for c in customers for v in range(n_vehicles)]))
+    result = opt.check()
+    if result == unsat:
+        return None
+    try:
+        model = opt.model()
+    except Z3Exception:
+        return None
+    return [[c for c in customers if is_true(model.evaluate(serves[c, v], model_completion=True))]
+            for v in range(n_vehicles)]
+
+
+def _route_worker(args):
+    """Worker: routes one salesperson in its own process (and Z3 context)."""
+    return _solve_route(*args)
+
+
+def vrp(n_vehicles, distances, demands, time_windows, travel_times, capacity,
+        supply_points=(0,), workers=None, timeout_ms=60000, max_rounds=10):
+    """
+    Solves the multiple salespeople problem: assign the customers, then route every salesperson.
+
+    The routes of the salespeople are independent once the customers are assigned,
+    so they are solved in parallel worker processes. A group of customers without a
+    feasible route is forbidden and the customers are assigned again.
+
+    Args:
+        n_vehicles (int): Number of salespeople.
+        distances (list of lists): A matrix representing distances between cities.
+        demands (list): Resources requested by each city.
+        time_windows (list of tuples): Earliest and latest visit time of each city.
+        travel_times (list of lists): Time needed to travel between each pair of cities.
+        capacity (int): Maximum resources carried by each salesperson.
+        supply_points (list): Cities where the salespeople recharge the capacity.
+        workers (int): Number of worker processes, by default one per CPU,
+            0 routes the salespeople one after the other in this process.
+        timeout_ms (int): Solver timeout of the assignment and of every route in milliseconds.
+        max_rounds (int): Maximum number of assignments tried.
+
+    Returns:
+        tuple: The route, visit times and loads of each salesperson (as returned by route())
+        and the total distance.
+        None: If no solution is found.
+    """
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 0 else None
+    try:
+        forbidden = []
+        for _ in range(max_rounds):
+            groups = assign_customers(n_vehicles, distances, demands, capacity, supply_points,
+                                      forbidden, timeout_ms)
+            if groups is None:
+                return None
+            jobs = [(group, distances, demands, time_windows, travel_times, capacity,
+                     supply_points, timeout_ms) for group in groups]
+            results = list((pool.map if pool else map)(_route_worker, jobs))
+            routes = [result for result, _ in results]
+            if all(result is not None for result in routes):
+                return routes, sum(result[3] for result in routes)
+            # Only groups proven to have no route are forbidden, a timeout gives up
+            failed = [group for group, (_, status) in zip(groups, results) if status == "unsat"]
+            if not failed:
+                return None
+            forbidden.extend(failed)
+        return None
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def solve_tsp_plus(instance, workers=None):
+    """
+    Solves one TSP+ instance described by a dictionary (as read from JSON).
+
+    Args:
+        instance (dict): The instance, with keys:
+            distances, demands, time_windows, capacity (required);
+            id, travel_times (default: the distances), supply_points (default: [0]),
+            vehicles (default: 1), timeout_ms (default: 60000).
+        workers (int): Worker processes routing the salespeople, see vrp().
+
+    Returns:
+        dict: The id of the instance, the status ("sat" or "no solution"), the route of
+        every salesperson with its visit times and loads, the total distance and the
+        solving time in seconds.
+    """
+    start_time = time.perf_counter()
+    distances = instance["distances"]
+    demands = instance["demands"]
+    time_windows = [tuple(window) for window in instance["time_windows"]]
+    capacity = instance["capacity"]
+    travel_times = instance.get("travel_times", distances)
+    supply_points = instance.get("supply_points", [0])
+    vehicles = instance.get("vehicles", 1)
+    timeout_ms = instance.get("timeout_ms", 60000)
+
+    if vehicles == 1:
+        result = route(list(range(1, len(distances))), distances, demands, time_windows, travel_times,
+                       capacity, supply_points, timeout_ms)
+        solution = None if result is None else ([result], result[3])
+    else:
+        solution = vrp(vehicles, distances, demands, time_windows, travel_times, capacity,
+                       supply_points, workers, timeout_ms)
+
+    output = {"id": instance.get("id"), "status": "no solution", "routes": [], "distance": None}
+    if solution is not None:
+        routes, calc_distance = solution
+        output["status"] = "sat"
+        output["distance"] = calc_distance
+        output["routes"] = [{"route": path,
+                             "visit_times": [times[c] for c in path],
+                             "loads": [loads[c] for c in path],
+                             "distance": route_distance}
+                            for path, times, loads, route_distance in routes]
+    output["time_s"] = round(time.perf_counter() - start_time, 3)
+    return output
+
+
+def _solve_line(line):
+    """
+    Worker: solves one JSON line, salespeople are routed inside the worker.
+    Any error of a malformed instance becomes its result, so the stream goes on.
+    """
+    start_time = time.perf_counter()
+    instance_id = None
+    try:
+        instance = json.loads(line)
+        if isinstance(instance, dict):
+            instance_id = instance.get("id")
+        return solve_tsp_plus(instance, workers=0)
+    except Exception as error:
+        return {"id": instance_id, "status": f"error: {type(error).__name__}: {error}", "routes": [],
+                "distance": None, "time_s": round(time.perf_counter() - start_time, 3)}
+
+
+def solve_stream(lines, output, workers=None):
+    """
+    Solves a stream of JSON-lines instances, writing every result as soon as it is ready.
+
+    At most two instances per worker are read ahead, so memory stays bounded
+    whatever the length of the stream. Results are written in completion order.
+
+    Args:
+        lines (iterable): Lines of JSON, one instance each (blank lines are skipped).
+        output (file): Where the JSON-lines results are written.
+        workers (int): Worker processes, each with its own Z3 context;
+            0 solves the instances in this process.
+    """
+    lines = (line for line in lines if line.strip())
+    if workers == 0:
+        for line in lines:
+            output.write(json.dumps(_solve_line(line)) + "\n")
+            output.flush()
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for line in lines:
+            pending.add(pool.submit(_solve_line, line))
+            if len(pending) >= 2 * workers:
+                pending = _write_done(pending, output)
+        while pending:
+            pending = _write_done(pending, output)
+
+
+def _write_done(pending, output):
+    """Waits for the first results among pending, writes them and returns the others."""
+    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        output.write(json.dumps(future.result()) + "\n")
+    output.flush()
+    return pending
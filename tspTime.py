@@ -0,0 +1,220 @@
+"""""
+            ### Traveling Salesman Problem, TSP benchmark ###
+
+Compares the encodings of TSP.py on random instances of growing size,
+measuring for each one the time needed to build the model, the peak
+memory of the process and the time needed by the solver.
+
+Every case runs in a fresh process so that the peak memory of one
+encoding does not leak into the next one.
+
+"""""
+
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+
+from z3 import Z3Exception, is_int_value, unknown, unsat
+
+from TSP import ENCODINGS, TSPSession, build_model, tsp, tsp_large
+
+
+def random_distances(n_city, seed=0):
+    """
+    Creates a symmetric distance matrix between random points on a grid.
+
+    Args:
+        n_city (int): Number of cities.
+        seed (int): Seed of the random generator, so that runs are reproducible.
+
+    Returns:
+        list of lists: A matrix of integer euclidean distances.
+    """
+    rng = random.Random(seed)
+    points = [(rng.randint(0, 1000), rng.randint(0, 1000)) for _ in range(n_city)]
+    return [[round(((xa - xb) ** 2 + (ya - yb) ** 2) ** 0.5) for (xb, yb) in points]
+            for (xa, ya) in points]
+
+
+def peak_memory_mb():
+    """Peak resident memory of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(n_city, encoding, timeout_ms, seed):
+    """Builds and solves one instance, returning its measurements."""
+    distances = random_distances(n_city, seed)
+    base_memory = peak_memory_mb()
+
+    start_time = time.perf_counter()
+    opt, read_path, total_distance = build_model(n_city, distances, encoding)
+    build_time = time.perf_counter() - start_time
+
+    opt.set("timeout", timeout_ms)
+    start_time = time.perf_counter()
+    result = opt.check()
+    solve_time = time.perf_counter() - start_time
+
+    # On timeout the optimizer may still hold the best tour found so far
+    best = None
+    if result != unsat:
+        try:
+            value = opt.model().evaluate(total_distance)
+            best = value.as_long() if is_int_value(value) else None
+        except Z3Exception:
+            pass
+
+    return {
+        "n": n_city,
+        "encoding": encoding,
+        "build_s": build_time,
+        "solve_s": solve_time,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "status": "timeout" if result == unknown else str(result),
+        "distance": best,
+    }
+
+
+def run_isolated(func, *args):
+    """Runs func(*args) in a fresh process and returns its result."""
+    with multiprocessing.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def benchmark(sizes=(10, 20, 40, 80), encodings=ENCODINGS, timeout_ms=60000, seed=0):
+    """
+    Runs every encoding on every instance size.
+
+    Args:
+        sizes (tuple): Number of cities of the instances.
+        encodings (tuple): Encodings of TSP.py to compare.
+        timeout_ms (int): Solver timeout for each case in milliseconds.
+        seed (int): Seed used to generate the instances.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_city in sizes:
+        for encoding in encodings:
+            row = run_isolated(_run_case, n_city, encoding, timeout_ms, seed)
+            print(f"n={row['n']:<4} {row['encoding']:<12} build {row['build_s']:8.3f}s  "
+                  f"solve {row['solve_s']:8.3f}s  peak {row['peak_mb']:8.1f}MB  "
+                  f"{row['status']:<8} distance {row['distance']}")
+            rows.append(row)
+    return rows
+
+
+def benchmark_large(sizes=(200, 500, 1000), workers=None, cluster_timeout_ms=2000, seed=0):
+    """
+    Measures the speedup of the cluster-and-stitch mode of TSP.py with more worker processes.
+
+    Args:
+        sizes (tuple): Number of cities of the instances.
+        workers (tuple): Numbers of worker processes to compare, by default 1 and every CPU.
+        cluster_timeout_ms (int): Wall-clock budget of every group in milliseconds.
+        seed (int): Seed used to generate the instances.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    if workers is None:
+        workers = sorted({1, os.cpu_count() or 1})
+    rows = []
+    for n_city in sizes:
+        distances = random_distances(n_city, seed)
+        serial_time = None
+        for n_workers in workers:
+            start_time = time.perf_counter()
+            _, total_distance = tsp_large(list(range(n_city)), distances, workers=n_workers,
+                                          cluster_timeout_ms=cluster_timeout_ms)
+            elapsed = time.perf_counter() - start_time
+            serial_time = serial_time or elapsed
+            print(f"n={n_city:<5} workers {n_workers:<3} time {elapsed:8.2f}s  "
+                  f"speedup {serial_time / elapsed:5.2f}x  distance {total_distance}")
+            rows.append({"n": n_city, "workers": n_workers, "time_s": elapsed, "distance": total_distance})
+    return rows
+
+
+def traffic_edits(distances, n_edits, changes_per_edit, seed=0):
+    """
+    Creates a stream of small symmetric changes of the distance matrix.
+
+    Returns:
+        list: One dictionary of new distances keyed by (from_city, to_city) for each edit.
+    """
+    rng = random.Random(seed)
+    current = [list(row) for row in distances]
+    edits = []
+    for _ in range(n_edits):
+        changes = {}
+        for _ in range(changes_per_edit):
+            a, b = rng.sample(range(len(current)), 2)
+            current[a][b] = current[b][a] = max(1, round(current[a][b] * rng.uniform(0.7, 1.5)))
+            changes[(a, b)] = changes[(b, a)] = current[a][b]
+        edits.append(changes)
+    return edits
+
+
+def benchmark_session(n_city=40, n_edits=20, changes_per_edit=3, timeout_ms=5000, seed=0):
+    """
+    Compares re-solving with a TSPSession against rebuilding the model after every edit.
+
+    Args:
+        n_city (int): Number of cities.
+        n_edits (int): Number of edits of the matrix.
+        changes_per_edit (int): Number of symmetric entries changed by each edit.
+        timeout_ms (int): Wall-clock budget of every solve in milliseconds.
+        seed (int): Seed used to generate the instance and the edits.
+
+    Returns:
+        dict: Total time and total distance of the tours found by each strategy.
+    """
+    distances = random_distances(n_city, seed)
+    edits = traffic_edits(distances, n_edits, changes_per_edit, seed)
+    cities = list(range(n_city))
+
+    # Rebuild from scratch after every edit
+    current = [list(row) for row in distances]
+    rebuild_time, rebuild_distance = 0.0, 0
+    for changes in edits:
+        for (a, b), distance in changes.items():
+            current[a][b] = distance
+        start_time = time.perf_counter()
+        rebuild_distance += tsp(cities, current, "successor", timeout_ms)[1]
+        rebuild_time += time.perf_counter() - start_time
+
+    # Keep one session alive
+    start_time = time.perf_counter()
+    session = TSPSession(cities, distances)
+    session_time, session_distance = time.perf_counter() - start_time, 0
+    for changes in edits:
+        start_time = time.perf_counter()
+        session.update(changes)
+        session_distance += session.solve(timeout_ms)[1]
+        session_time += time.perf_counter() - start_time
+
+    print(f"n={n_city} edits={n_edits}x{changes_per_edit}")
+    print(f"  rebuild  time {rebuild_time:8.2f}s  total distance {rebuild_distance}")
+    print(f"  session  time {session_time:8.2f}s  total distance {session_distance}")
+    return {"rebuild_s": rebuild_time, "rebuild_distance": rebuild_distance,
+            "session_s": session_time, "session_distance": session_distance}
+
+
+# Example usage
+if __name__ == "__main__":
+    if "large" in sys.argv[1:]:
+        # Speedup of the cluster-and-stitch mode: python tspTime.py large
+        benchmark_large()
+    elif "session" in sys.argv[1:]:
+        # Incremental re-solving on a stream of edits: python tspTime.py session
+        benchmark_session()
+    else:
+        # Solver timeout per case can be passed on the command line (in seconds)
+        timeout_s = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+        benchmark(timeout_ms=timeout_s * 1000)
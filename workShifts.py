@@ -29,7 +29,7 @@ In this example, we will have a month of work with the following requests:
 
 ### 1 12-hour shift from 8:00 am and 8:00 pm over 7 days always covered
 
-### 2 N,V can work 4h day for 6 days or 5h day for 5 days + 4h for 1 day 
+### 2 N,V can work 4h day for 6 days or 5h day for 4 days + 4h for 1 day
 
 ### 3 G,D can work 6h day for 4 days + 8h day with 1 hour off for 2 days.
 
@@ -46,194 +46,1139 @@ In this example, we will have a month of work with the following requests:
       the second and fourth week only on Saturdays at 6 pm
       so D must finish at least 2h before in  order to be 
       adequately prepared for the event
-      
-
-"""""
-
-from z3 import *
-
-# Constants
-days = 28  # 4 weeks of 7 days
-shifts = 12  # 12-hour shifts
-employees = ["N", "V", "G", "D"]
-hours_per_week = {"N": 24, "V": 24, "G": 40, "D": 40}
-
-# Solver
-solver = Solver()
-
-# Variables
-schedule = {e: [Int(f"{e}_{d}") for d in range(days)] for e in employees}
-
-# Constraints
-for e in employees:
-    for d in range(days):
-        # Each shift is between 0 and 12 hours
-        solver.add(schedule[e][d] >= 0, schedule[e][d] <= shifts)
-
-# 1. Weekly hours for each employee
-for e, weekly_hours in hours_per_week.items():
-    for week in range(4):  # 4 weeks
-        solver.add(Sum(schedule[e][week * 7: (week + 1) * 7]) == weekly_hours)
-
-# 2. Daily work limits for N and V (24 hours per week, shifts of max 4 hours/day) #TODO 2 loops one to each person and merge whit specific costrains 
-for e in ["N", "V"]:
-    for week in range(4):
-        week_schedule = schedule[e][week * 7: (week + 1) * 7]
-        solver.add(
-            Or(
-                And([Sum(week_schedule) == 24] + [w <= 4 for w in week_schedule]),
-                And(Sum(week_schedule[:6]) == 24, week_schedule[6] == 4)
-            )
-        )
-
-# For G and D (work 40 hours a week with specific shift constraints)
-for e in ["G", "D"]:
-    for week in range(4):
-        week_schedule = schedule[e][week * 7: (week + 1) * 7]
-        solver.add(
-            And(
-                Sum(week_schedule) == 40,  # Total sum for the week
-                Sum([If(w == 6, 1, 0) for w in week_schedule]) == 4,  # 4 days of 6-hour shifts
-                Sum([If(w == 8, 1, 0) for w in week_schedule]) == 2   # 2 days of 8-hour shifts
-            )
-        )
-
-# 3. Max 8 consecutive days of work
-for e in employees:
-    for start in range(days - 8):
-        solver.add(Sum(schedule[e][start:start + 8]) <= 8 * shifts)  # Ensure no more than 8 consecutive days of work
-
-# 4. Constraint for Saturday/Sunday off over 4 weeks but not at the same time
-for week in range(4):
-    # Check that each employee has either Saturday or Sunday off, but not both in the same week
-    for e in employees:
-        solver.add(
-            Or(
-                schedule[e][week * 7 + 5] == 0,  # Saturday off
-                schedule[e][week * 7 + 6] == 0   # Sunday off
-            )
-        )
-
-# 5. Specific constraints for N and V
-for week in range(4):
-    # N: Work after 4 pm for 3 days (Monday-Friday)
-    solver.add(Sum([If(schedule["N"][week * 7 + d] >= 4, 1, 0) for d in range(5)]) >= 3)
-    # V: End shift before 2 pm at least 4 days
-    solver.add(Sum([If(schedule["V"][week * 7 + d] <= 6, 1, 0) for d in range(7)]) >= 3)
-
-# 6. D's Napoli game constraints
-napoli_games = {
-    "week_1": [2, 6],
-    "week_2": [5],
-    "week_3": [2, 6],
-    "week_4": [5]
-}
-game_times = [20, 20, 18, 18]  # In hours
-
-for week, (game_days, game_time) in enumerate(zip(napoli_games.values(), game_times)):
-    for day in game_days:
-        solver.add(schedule["D"][week * 7 + day] <= game_time - 2)
-
-# 7. Constraint that the 12 hours of opening must always be covered
-for d in range(days):
-    solver.add(Sum([schedule[e][d] for e in employees]) >= 12)  # 12 hours of covered opening every day
-
-# Solve
-if solver.check() == sat:
-    model = solver.model()
-    for e in employees:
-        print(f"Schedule for {e}:")
-        print([model[schedule[e][d]] for d in range(days)])
-else:
-    print("No solution found.")
-
-
-""""
-Problem to solve: display otput not in working hours per day but in time winows. Output: No solution Found!
-
-from z3 import *
-
-# Constants
-days = 28  # 4 weeks of 7 days
-shifts = 12  # 12-hour shifts
-employees = ["N", "V", "G", "D"]
-hours_per_week = {"N": 24, "V": 24, "G": 40, "D": 40}
-shop_opening_time = 8  # Shop opens at 8 am
-
-# Solver
-solver = Solver()
-
-# Variables
-schedule = {e: [Int(f"{e}_{d}") for d in range(days)] for e in employees}
-start_time = {e: [Int(f"{e}_start_{d}") for d in range(days)] for e in employees}
-end_time = {e: [Int(f"{e}_end_{d}") for d in range(days)] for e in employees}
-
-
-# Constraints
-for e in employees:
-    for d in range(days):
-        # Each shift is between 0 and 12 hours
-        solver.add(schedule[e][d] >= 0, schedule[e][d] <= shifts)
-        # Start time is between shop opening time and closing time - shift duration
-        solver.add(start_time[e][d] >= shop_opening_time, start_time[e][d] <= 20 - schedule[e][d])
-        # End time is start time + shift duration
-        solver.add(end_time[e][d] == start_time[e][d] + schedule[e][d])
-
-# 1. Weekly hours for each employee
-# ... (rest of your constraints remain the same)
-
-# Solve
-if solver.check() == sat:
-    model = solver.model()
-    for e in employees:
-        print(f"Schedule for {e}:")
-        for d in range(days):
-            start = model[start_time[e][d]].as_long()
-            end = model[end_time[e][d]].as_long()
-            print(f"Day {d+1}: {start}:00 - {end}:00") 
-else:
-    print("No solution found.")
-""""
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
 
 
+                        ### Engines ###
 
+### "int"     One Int per employee and day holding the hours worked, with
+              the rules written as sums of If(...) counters.
 
+### "boolean" One Bool per employee, day and allowed shift length
+              ("N works 5 hours on day 3"). A day off has all of them
+              false, and every rule becomes a native pseudo-boolean
+              constraint (PbEq, PbGe, AtMost, AtLeast), so the solver
+              never has to reason about integer arithmetic.
 
+Shifts are counted in hours from the opening of the shop: a shift that
+ends at closing time covers the evening (6), and one that starts at
+opening ends early in the afternoon (7) and before the games (8).
 
 
+                        ### Shift windows ###
 
+solve_windows() gives every employee-day a start and an end inside the
+opening hours instead of a number of hours. On top of the Bools of the
+"boolean" engine, every employee-day has two ladders over the opening
+hours, "the shift has started by hour h" and "has ended by hour h", so
+the window is contiguous and the employee is present at hour h when it
+has started and not ended. The coverage is then checked hour by hour
+with one AtLeast over the presences, a model linear in staff x days x
+hours (one Bool per possible window instead was much slower to solve).
+Here the preferences are about real times: N ends at closing time after
+starting by 4:00 pm, V ends by 2:00 pm and D ends 2 hours before kick-off.
 
 
+                        ### Diagnosis ###
 
+When there is no roster, diagnose() adds every rule instance (weekly hours
+of N in week 2, coverage of day 17, ...) behind its own Bool and checks
+them as assumptions on one solver. It reports a minimal unsat core, rules
+that cannot hold together, and a minimal correction set, rules to relax
+so that all the others hold, relaxing preferences before contract rules.
 
 
+                        ### Sessions ###
 
+RosterSession keeps one solver alive for the edits of the day: a new game,
+a sick day, different weekly hours. Only the rules an edit touches are
+encoded again, behind new assumption literals, and the solver starts from
+the previous roster. roll() retires the first week, whose shifts still
+count for the consecutive days, and adds a new one at the end.
 
 
+                        ### Rules from a file ###
 
+load_rules() reads the rules from a JSON file (workShifts.json holds the
+shop above): contracts, stores with the hours to cover, games with their
+kick-offs, and the staff with contract, store and preferences, where an
+entry with a "count" stands for many employees alike. Every family of
+rules is a generator over one employee and one week (EMPLOYEE_RULES, plus
+coverage_rules() for the stores), so build_rules_model() handles any
+number of staff and weeks. The shift windows reuse the families over
+shift lengths and have their own for times of the day (WINDOW_TIME_RULES),
+and the "int" engine reads the same rules. The engines called with staff,
+weeks and coverage run on default_rules(), the constants of this file.
 
+"""""
 
+import copy
+import json
+import sys
+import time
 
+from z3 import *
 
+# Opening hours of the shop
+OPENING = 8
+CLOSING = 20
+SHIFT_HOURS = CLOSING - OPENING  # Hours to cover every day
+DAYS_PER_WEEK = 7
 
+# Weekly hours, allowed shift lengths and required number of shifts of a length
+CONTRACTS = {
+    "part_time": {"hours": 24, "lengths": (4, 5), "counts": {}},
+    "full_time": {"hours": 40, "lengths": (6, 8), "counts": {6: 4, 8: 2}},
+}
 
+# Employees and their contracts
+STAFF = {"N": "part_time", "V": "part_time", "G": "full_time", "D": "full_time"}
+
+MAX_CONSECUTIVE_DAYS = 8
+
+# Preferences: days per week working after 4:00 pm (Monday to Friday) and ending before 2:00 pm
+LATE_SHIFT_DAYS = {"N": 3}
+LATE_SHIFT_START = 16
+EARLY_SHIFT_DAYS = {"V": 3}
+EARLY_SHIFT_END = 14
+
+# Napoli games, weekday -> kick-off hour, alternating between odd and even weeks
+NAPOLI_FANS = ("D",)
+NAPOLI_GAMES = ({2: 20, 6: 20}, {5: 18})
+HOURS_BEFORE_GAME = 2
+
+# Ways of encoding the roster, see the docstring
+ENGINES = ("int", "boolean")
+
+# Rule families that diagnose() can switch off, from the last to relax to the first,
+# then the games (their rules are named after the game)
+FAMILIES = ("sick_days", "weekly_hours", "shift_counts", "consecutive_days", "weekend", "coverage",
+            "late_shift", "early_shift")
+
+
+def _guard(literal, constraint):
+    """
+    The constraint switched on by literal. Pseudo-boolean constraints stay pseudo-boolean,
+    with the literal as one more term (big-M), because under an Implies the solver would
+    handle them as plain formulas and lose their native propagation.
+    """
+    kind = constraint.decl().kind() if is_app(constraint) else None
+    if kind not in (Z3_OP_PB_AT_MOST, Z3_OP_PB_AT_LEAST, Z3_OP_PB_LE, Z3_OP_PB_GE, Z3_OP_PB_EQ):
+        return Implies(literal, constraint)
+    bound, *coefficients = constraint.decl().params()
+    terms = list(zip(constraint.children(), coefficients or [1] * constraint.num_args()))
+    guarded = []
+    if kind in (Z3_OP_PB_AT_MOST, Z3_OP_PB_LE, Z3_OP_PB_EQ):
+        # sum <= bound, or anything up to the sum of the coefficients when the literal is false
+        slack = sum(coefficient for _, coefficient in terms) - bound
+        if slack > 0:
+            guarded.append(PbLe(terms + [(literal, slack)], bound + slack))
+    if kind in (Z3_OP_PB_AT_LEAST, Z3_OP_PB_GE, Z3_OP_PB_EQ) and bound > 0:
+        # sum >= bound, or anything from 0 when the literal is false
+        guarded.append(PbGe(terms + [(Not(literal), bound)], bound))
+    return And(guarded)
+
+
+def _adder(solver, tracked):
+    """
+    Returns add(key, constraint), which asserts the constraint, or when tracked is a dict
+    asserts it behind the Bool of its key, so that assumptions can switch it on and off.
+    Constraints sharing a key share the Bool.
+    """
+    def add(key, constraint):
+        if tracked is None:
+            solver.add(constraint)
+            return
+        if key not in tracked:
+            tracked[key] = (FreshBool("track " + " ".join(key)), [])
+        literal, constraints = tracked[key]
+        constraints.append(constraint)
+        solver.add(_guard(literal, constraint))
+    return add
+
+
+def default_rules(staff=STAFF, weeks=4, coverage=SHIFT_HOURS):
+    """
+    The rules of the shop at the top of this file, in the format of load_rules().
+
+    Args:
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+
+    Returns:
+        dict: The rules, see load_rules().
+    """
+    return {
+        "weeks": weeks,
+        "opening": OPENING,
+        "closing": CLOSING,
+        "max_consecutive_days": MAX_CONSECUTIVE_DAYS,
+        "late_shift_start": LATE_SHIFT_START,
+        "early_shift_end": EARLY_SHIFT_END,
+        "contracts": {name: {"hours": rules["hours"], "lengths": tuple(rules["lengths"]), "counts": dict(rules["counts"])}
+                      for name, rules in CONTRACTS.items()},
+        "stores": {"shop": coverage},
+        "games": {"napoli": {"hours_before": HOURS_BEFORE_GAME, "weeks": [dict(games) for games in NAPOLI_GAMES],
+                             "days": {}}},
+        "staff": {e: {"contract": contract, "store": "shop",
+                      "late_shift_days": LATE_SHIFT_DAYS.get(e, 0),
+                      "early_shift_days": EARLY_SHIFT_DAYS.get(e, 0),
+                      "games": ["napoli"] if e in NAPOLI_FANS else [],
+                      "weekly_hours": {}, "sick_days": []}
+                  for e, contract in staff.items()},
+    }
+
+
+def load_rules(path):
+    """
+    Reads the rules of a roster from a JSON file, see workShifts.json.
+
+    Missing settings take the values of the shop at the top of this file. An entry
+    of "staff" with a "count" stands for that many employees with the same rules,
+    named after it with a number (a "count" of 3 for "P" gives P1, P2 and P3).
+    Every employee works in one of the "stores", each with its hours to cover every
+    day, and follows the "games" listed by name: a game on a weekday of the weekly
+    pattern (alternating over the weeks) or on a day of "days" (counted from the first
+    day of the roster) ends the shift "hours_before" the kick-off.
+
+    Every engine reads these rules: build_rules_model(), build_int_rules_model()
+    and build_window_rules_model().
+
+    Args:
+        path (str): The JSON file.
+
+    Returns:
+        dict: The rules, with weekdays, days and weeks as int keys.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    rules = default_rules({}, config.get("weeks", 4))
+    for key in ("opening", "closing", "max_consecutive_days", "late_shift_start", "early_shift_end"):
+        rules[key] = config.get(key, rules[key])
+    if "contracts" in config:
+        rules["contracts"] = {name: {"hours": contract["hours"], "lengths": tuple(contract["lengths"]),
+                                     "counts": {int(length): count for length, count in contract.get("counts", {}).items()}}
+                              for name, contract in config["contracts"].items()}
+    rules["stores"] = config.get("stores", {"shop": rules["closing"] - rules["opening"]})
+    if "games" in config:
+        rules["games"] = {name: {"hours_before": game.get("hours_before", HOURS_BEFORE_GAME),
+                                 "weeks": [{int(day): kick_off for day, kick_off in week.items()}
+                                           for week in game.get("weeks", [])],
+                                 "days": {int(day): kick_off for day, kick_off in game.get("days", {}).items()}}
+                          for name, game in config["games"].items()}
+    first_store = next(iter(rules["stores"]))
+    for name, entry in (config["staff"] if "staff" in config else STAFF).items():
+        if isinstance(entry, str):
+            entry = {"contract": entry}
+        person = {"contract": entry["contract"], "store": entry.get("store", first_store),
+                  "late_shift_days": entry.get("late_shift_days", 0),
+                  "early_shift_days": entry.get("early_shift_days", 0),
+                  "games": list(entry.get("games", [])),
+                  "weekly_hours": {int(week): hours for week, hours in entry.get("weekly_hours", {}).items()},
+                  "sick_days": list(entry.get("sick_days", []))}
+        names = [name] if "count" not in entry else [f"{name}{i + 1}" for i in range(entry["count"])]
+        for e in names:
+            rules["staff"][e] = copy.deepcopy(person)
+    return rules
+
+
+def _week_days(week):
+    return range(week * DAYS_PER_WEEK, (week + 1) * DAYS_PER_WEEK)
+
+
+def _game_days(rules, name, week):
+    """Longest shift on every day of a week with a game, by day index."""
+    game = rules["games"][name]
+    days = _week_days(week)
+    kick_offs = {}
+    if game["weeks"]:
+        kick_offs = {days[day]: kick_off for day, kick_off in game["weeks"][week % len(game["weeks"])].items()}
+    # Games on given days replace the weekly pattern
+    kick_offs.update({d: kick_off for d, kick_off in game["days"].items() if d in days})
+    return {d: kick_off - game["hours_before"] - rules["opening"] for d, kick_off in kick_offs.items()}
+
+
+def _week_bound(person, week):
+    """PbEq for the weekly rules of a person, PbLe (at most) in a week with sick days."""
+    return PbLe if any(d in _week_days(week) for d in person["sick_days"]) else PbEq
+
+
+# Every family of rules is a generator of (key, constraint) over the shifts of one
+# employee in one week, shift[e][d][length] being true if e works that long on day d.
+
+def weekly_hours_rules(rules, shift, e, week):
+    """2. Hours worked in the week: those of the contract, or those set for that week."""
+    person = rules["staff"][e]
+    hours = person["weekly_hours"].get(week, rules["contracts"][person["contract"]]["hours"])
+    terms = [(x, length) for d in _week_days(week) for length, x in shift[e][d].items()]
+    yield ("weekly_hours", e, f"week {week + 1}"), _week_bound(person, week)(terms, hours)
+
+
+def shift_counts_rules(rules, shift, e, week):
+    """3. Number of shifts of each length, unless the weekly hours were changed."""
+    person = rules["staff"][e]
+    if week in person["weekly_hours"]:
+        return
+    for length, count in rules["contracts"][person["contract"]]["counts"].items():
+        yield (("shift_counts", e, f"week {week + 1}"),
+               _week_bound(person, week)([(shift[e][d][length], 1) for d in _week_days(week)], count))
+
+
+def consecutive_days_rules(rules, shift, e, week):
+    """4. Max consecutive days of work: in every window ending this week one day more is off."""
+    longest = rules["max_consecutive_days"]
+    for end in _week_days(week):
+        start = end - longest
+        if start in shift[e]:
+            window = [x for d in range(start, end + 1) for x in shift[e][d].values()]
+            yield ("consecutive_days", e, f"days {start + 1}-{end + 1}"), AtMost(*window, longest)
+
+
+def weekend_rules(rules, shift, e, week):
+    """5. Saturday or Sunday off."""
+    days = _week_days(week)
+    yield ("weekend", e, f"week {week + 1}"), AtMost(*shift[e][days[5]].values(), *shift[e][days[6]].values(), 1)
+
+
+def late_shift_rules(rules, shift, e, week):
+    """6. Work until closing time, starting by late_shift_start, on some days from Monday to Friday."""
+    wanted = rules["staff"][e]["late_shift_days"]
+    if wanted:
+        late = [x for d in _week_days(week)[:5] for length, x in shift[e][d].items()
+                if length >= rules["closing"] - rules["late_shift_start"]]
+        yield ("late_shift", e, f"week {week + 1}"), AtLeast(*late, wanted) if late else BoolVal(False)
+
+
+def early_shift_rules(rules, shift, e, week):
+    """7. End by early_shift_end on some days: the other days are at most 7 minus those."""
+    wanted = rules["staff"][e]["early_shift_days"]
+    if wanted:
+        long = [x for d in _week_days(week) for length, x in shift[e][d].items()
+                if length > rules["early_shift_end"] - rules["opening"]]
+        if long:
+            yield ("early_shift", e, f"week {week + 1}"), AtMost(*long, DAYS_PER_WEEK - wanted)
+
+
+def game_rules(rules, shift, e, week):
+    """8. End the shift in time for every game followed by e, the key named after the game."""
+    for name in rules["staff"][e]["games"]:
+        for d, limit in _game_days(rules, name, week).items():
+            for length, x in shift[e][d].items():
+                if length > limit:
+                    yield (name, e, f"day {d + 1}"), Not(x)
+
+
+def sick_day_rules(rules, shift, e, week):
+    """No shift on the sick days of e."""
+    for d in rules["staff"][e]["sick_days"]:
+        if d in _week_days(week):
+            yield ("sick_days", e, f"day {d + 1}"), Not(Or(list(shift[e][d].values())))
+
+
+EMPLOYEE_RULES = (weekly_hours_rules, shift_counts_rules, consecutive_days_rules, weekend_rules,
+                  late_shift_rules, early_shift_rules, game_rules, sick_day_rules)
+
+
+def coverage_rules(rules, shift, week):
+    """1. The opening hours of every store are covered on every day of the week by its staff."""
+    for store, coverage in rules["stores"].items():
+        members = [e for e, person in rules["staff"].items() if person["store"] == store]
+        for d in _week_days(week):
+            yield (("coverage", store, f"day {d + 1}"),
+                   PbGe([(x, length) for e in members for length, x in shift[e][d].items()], coverage))
+
+
+def _boolean_day(solver, e, lengths, d):
+    """The Bools of the shift lengths e can work on day d, at most one of them true."""
+    day = {length: Bool(f"{e}_{d}_{length}h") for length in lengths}
+    if len(day) > 1:
+        solver.add(AtMost(*day.values(), 1))
+    return day
+
+
+def _add_boolean_week(solver, rules, shift, week):
+    """Adds the Bools of a week to shift[e], the shift of every employee by day."""
+    for e, person in rules["staff"].items():
+        lengths = rules["contracts"][person["contract"]]["lengths"]
+        for d in _week_days(week):
+            shift[e][d] = _boolean_day(solver, e, lengths, d)
+
+
+def _read_hours(model, shift, days):
+    """The hours of every employee on the given days in a model."""
+    return {e: [next((length for length, x in shift[e][d].items() if is_true(model.evaluate(x))), 0) for d in days]
+            for e in shift}
+
+
+def build_rules_model(solver, rules, tracked=None):
+    """
+    Adds a roster to a solver with one Bool per employee, day and shift length,
+    every family of rules emitted by its generator in EMPLOYEE_RULES and coverage_rules().
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        rules (dict): The rules, see load_rules().
+        tracked (dict): Optional, filled with the Bool and the constraints of every rule
+            instance by key (family, employee, week or day), see _adder().
+
+    Returns:
+        function: Reads the hours of every employee and day from a model.
+    """
+    days = range(rules["weeks"] * DAYS_PER_WEEK)
+    add = _adder(solver, tracked)
+    shift = {e: {} for e in rules["staff"]}
+    for week in range(rules["weeks"]):
+        _add_boolean_week(solver, rules, shift, week)
+        for e in rules["staff"]:
+            for family in EMPLOYEE_RULES:
+                for key, constraint in family(rules, shift, e, week):
+                    add(key, constraint)
+        for key, constraint in coverage_rules(rules, shift, week):
+            add(key, constraint)
+
+    return lambda model: _read_hours(model, shift, days)
+
+
+def build_boolean_model(solver, staff, weeks, coverage=SHIFT_HOURS, tracked=None):
+    """
+    Adds the roster rules to a solver with one Bool per employee, day and shift length.
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+        tracked (dict): Optional, filled with the Bool and the constraints of every rule
+            instance by key (family, employee, week or day), see _adder().
+
+    Returns:
+        function: Reads the hours of every employee and day from a model.
+    """
+    return build_rules_model(solver, default_rules(staff, weeks, coverage), tracked)
+
+
+def build_int_model(solver, staff, weeks, coverage=SHIFT_HOURS):
+    """
+    Adds the roster rules to a solver with one Int of hours per employee and day.
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+
+    Returns:
+        function: Reads the hours of every employee and day from a model.
+    """
+    return build_int_rules_model(solver, default_rules(staff, weeks, coverage))
+
+
+def build_int_rules_model(solver, rules):
+    """
+    Adds a roster to a solver with one Int of hours per employee and day,
+    the rules written as sums of If(...) counters.
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        rules (dict): The rules, see load_rules().
+
+    Returns:
+        function: Reads the hours of every employee and day from a model.
+    """
+    days = range(rules["weeks"] * DAYS_PER_WEEK)
+    longest = rules["max_consecutive_days"]
+    schedule = {e: [Int(f"{e}_{d}") for d in days] for e in rules["staff"]}
+
+    for e, person in rules["staff"].items():
+        contract = rules["contracts"][person["contract"]]
+        for d in days:
+            # Every day is off or one of the shift lengths of the contract
+            solver.add(Or([schedule[e][d] == 0] + [schedule[e][d] == length for length in contract["lengths"]]))
+        for d in person["sick_days"]:
+            if d in days:
+                solver.add(schedule[e][d] == 0)
+
+        for week in range(rules["weeks"]):
+            week_schedule = [schedule[e][d] for d in _week_days(week)]
+            exact = _week_bound(person, week) is PbEq
+
+            def bound(total, value):
+                return total == value if exact else total <= value
+
+            # 2, 3. Weekly hours and number of shifts of each length
+            solver.add(bound(Sum(week_schedule), person["weekly_hours"].get(week, contract["hours"])))
+            if week not in person["weekly_hours"]:
+                for length, count in contract["counts"].items():
+                    solver.add(bound(Sum([If(w == length, 1, 0) for w in week_schedule]), count))
+            # 5. Saturday or Sunday off
+            solver.add(Or(week_schedule[5] == 0, week_schedule[6] == 0))
+            # 6. Work until closing time, Monday to Friday
+            if person["late_shift_days"]:
+                solver.add(Sum([If(w >= rules["closing"] - rules["late_shift_start"], 1, 0) for w in week_schedule[:5]])
+                           >= person["late_shift_days"])
+            # 7. End early
+            if person["early_shift_days"]:
+                solver.add(Sum([If(w <= rules["early_shift_end"] - rules["opening"], 1, 0) for w in week_schedule])
+                           >= person["early_shift_days"])
+            # 8. Games
+            for name in person["games"]:
+                for d, limit in _game_days(rules, name, week).items():
+                    solver.add(schedule[e][d] <= limit)
+
+        # 4. Max consecutive days of work: in every window one day more is off
+        for start in range(len(days) - longest):
+            window = schedule[e][start:start + longest + 1]
+            solver.add(Sum([If(w > 0, 1, 0) for w in window]) <= longest)
+
+    # 1. The opening hours of every store must always be covered
+    for store, coverage in rules["stores"].items():
+        members = [e for e, person in rules["staff"].items() if person["store"] == store]
+        for d in days:
+            solver.add(Sum([schedule[e][d] for e in members]) >= coverage)
+
+    def read(model):
+        return {e: [model.evaluate(w).as_long() for w in schedule[e]] for e in rules["staff"]}
+
+    return read
+
+
+def check_roster(roster, rules):
+    """
+    Checks a roster against the rules, independently of the engine that built it.
+
+    Args:
+        roster (dict): Hours worked by every employee on every day.
+        rules (dict): The rules, see load_rules().
+
+    Returns:
+        bool: True if the roster respects every rule.
+    """
+    weeks = rules["weeks"]
+    days = weeks * DAYS_PER_WEEK
+    longest = rules["max_consecutive_days"]
+    for e, person in rules["staff"].items():
+        contract = rules["contracts"][person["contract"]]
+        hours = roster[e]
+        if len(hours) != days or any(h != 0 and h not in contract["lengths"] for h in hours):
+            return False
+        if any(hours[d] for d in person["sick_days"] if d < days):
+            return False
+        for week in range(weeks):
+            week_hours = hours[week * DAYS_PER_WEEK: (week + 1) * DAYS_PER_WEEK]
+            exact = _week_bound(person, week) is PbEq
+            counts = {} if week in person["weekly_hours"] else contract["counts"]
+            wanted = [(sum(week_hours), person["weekly_hours"].get(week, contract["hours"]))]
+            wanted += [(week_hours.count(length), count) for length, count in counts.items()]
+            if any(value > bound or exact and value != bound for value, bound in wanted):
+                return False
+            if week_hours[5] and week_hours[6]:
+                return False
+            late = sum(h >= rules["closing"] - rules["late_shift_start"] for h in week_hours[:5])
+            if late < person["late_shift_days"]:
+                return False
+            early = sum(h <= rules["early_shift_end"] - rules["opening"] for h in week_hours)
+            if early < person["early_shift_days"]:
+                return False
+            if any(hours[d] > limit for name in person["games"] for d, limit in _game_days(rules, name, week).items()):
+                return False
+        if any(all(hours[start:start + longest + 1]) for start in range(days - longest)):
+            return False
+    return all(sum(roster[e][d] for e, person in rules["staff"].items() if person["store"] == store) >= coverage
+               for store, coverage in rules["stores"].items() for d in range(days))
+
+
+def is_valid_roster(roster, staff, weeks, coverage=SHIFT_HOURS):
+    """
+    Checks a roster against every rule, independently of the engine that built it.
+
+    Args:
+        roster (dict): Hours worked by every employee on every day.
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+
+    Returns:
+        bool: True if the roster respects every rule.
+    """
+    return check_roster(roster, default_rules(staff, weeks, coverage))
+
+
+def solve_roster(staff=STAFF, weeks=4, engine="boolean", coverage=SHIFT_HOURS, timeout_ms=None, rules=None):
+    """
+    Finds a roster that respects every rule.
+
+    Args:
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        engine (str): One of ENGINES.
+        coverage (int): Hours to cover every day.
+        timeout_ms (int): Optional timeout of the solver in milliseconds.
+        rules (dict): Optional rules replacing staff, weeks and coverage, see load_rules().
+
+    Returns:
+        dict: The hours worked by every employee on every day.
+        None: If there is no roster (or none was found in time).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if rules is None:
+        rules = default_rules(staff, weeks, coverage)
+    solver = Solver()
+    if timeout_ms is not None:
+        solver.set("timeout", timeout_ms)
+    build = build_int_rules_model if engine == "int" else build_rules_model
+    read = build(solver, rules)
+    if solver.check() != sat:
+        return None
+    return read(solver.model())
+
+
+def interchangeable(rules):
+    """
+    Groups of employees of the same store with the same contract and no personal
+    preference, game, sick day or changed weekly hours, whose rosters can be swapped.
+    """
+    groups = {}
+    for e, person in rules["staff"].items():
+        if not (person["late_shift_days"] or person["early_shift_days"] or person["games"]
+                or person["sick_days"] or person["weekly_hours"]):
+            groups.setdefault((person["store"], person["contract"]), []).append(e)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+# The window engine keeps the families over shift lengths, and replaces those about
+# times of the day with generators over the ladders, (started, ended) of every employee-day
+
+def late_window_rules(rules, ladders, e, week):
+    """6. Work until closing time, starting by late_shift_start, on some days from Monday to Friday."""
+    wanted = rules["staff"][e]["late_shift_days"]
+    if wanted:
+        started, ended = ladders
+        late = [And(started[e][d][rules["late_shift_start"] - rules["opening"]], Not(ended[e][d][-1]))
+                for d in _week_days(week)[:5]]
+        yield ("late_shift", e, f"week {week + 1}"), AtLeast(*late, wanted)
+
+
+def early_window_rules(rules, ladders, e, week):
+    """7. End by early_shift_end (or a day off) on some days."""
+    wanted = rules["staff"][e]["early_shift_days"]
+    if wanted:
+        started, ended = ladders
+        early = [Or(Not(started[e][d][-1]), ended[e][d][rules["early_shift_end"] - rules["opening"]])
+                 for d in _week_days(week)]
+        yield ("early_shift", e, f"week {week + 1}"), AtLeast(*early, wanted)
+
+
+def game_window_rules(rules, ladders, e, week):
+    """8. End the shift hours_before the kick-off of every game followed by e."""
+    started, ended = ladders
+    for name in rules["staff"][e]["games"]:
+        for d, limit in _game_days(rules, name, week).items():
+            if limit < rules["closing"] - rules["opening"]:
+                yield (name, e, f"day {d + 1}"), Or(Not(started[e][d][-1]), ended[e][d][max(limit, 0)])
+
+
+WINDOW_RULES = (weekly_hours_rules, shift_counts_rules, consecutive_days_rules, weekend_rules, sick_day_rules)
+WINDOW_TIME_RULES = (late_window_rules, early_window_rules, game_window_rules)
+
+
+def hourly_coverage_rules(rules, present, week):
+    """1. Every opening hour of every store has enough of its staff, coverage / opening hours."""
+    opening_hours = rules["closing"] - rules["opening"]
+    for store, coverage in rules["stores"].items():
+        members = [e for e, person in rules["staff"].items() if person["store"] == store]
+        per_hour = -(-coverage // opening_hours)
+        for d in _week_days(week):
+            for h in range(opening_hours):
+                yield (("coverage", f"{store} {rules['opening'] + h}:00", f"day {d + 1}"),
+                       AtLeast(*[present[e][d][h] for e in members], per_hour))
+
+
+def build_window_model(solver, staff, weeks, coverage=SHIFT_HOURS, tracked=None):
+    """
+    Adds the roster rules to a solver with the shift of every employee and day as
+    two ladders of Bools over the opening hours, "started by hour h" and "ended by hour h".
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day, so coverage / SHIFT_HOURS employees in every hour.
+        tracked (dict): Optional, filled with the Bool and the constraints of every rule
+            instance by key (family, employee, week or day), see _adder().
+
+    Returns:
+        function: Reads the (start, end) of every employee and day from a model, None on days off.
+    """
+    return build_window_rules_model(solver, default_rules(staff, weeks, coverage), tracked)
+
+
+def build_window_rules_model(solver, rules, tracked=None):
+    """
+    Adds a roster of shift windows to a solver, the ladders of build_window_model()
+    on top of the Bools of build_rules_model().
+
+    Args:
+        solver (Solver): Where the constraints are added.
+        rules (dict): The rules, see load_rules().
+        tracked (dict): Optional, filled with the Bool and the constraints of every rule
+            instance by key (family, employee, week or day), see _adder().
+
+    Returns:
+        function: Reads the (start, end) of every employee and day from a model, None on days off.
+    """
+    days = range(rules["weeks"] * DAYS_PER_WEEK)
+    add = _adder(solver, tracked)
+    opening = rules["opening"]
+    hours = range(rules["closing"] - opening)  # Hours of the opening, counted from opening
+    # shift[e][d][length] is true if e works a shift of that length on day d, as in build_rules_model()
+    shift = {e: {} for e in rules["staff"]}
+    # started[e][d][h] and ended[e][d][h]: the shift has started by / ended by hour h, present[e][d][h] in between
+    started = {e: [[Bool(f"{e}_{d}_started_{opening + h}") for h in hours] for d in days] for e in rules["staff"]}
+    ended = {e: [[Bool(f"{e}_{d}_ended_{opening + h}") for h in hours] for d in days] for e in rules["staff"]}
+    present = {e: [[Bool(f"{e}_{d}_at_{opening + h}") for h in hours] for d in days] for e in rules["staff"]}
+
+    for week in range(rules["weeks"]):
+        _add_boolean_week(solver, rules, shift, week)
+        for e in rules["staff"]:
+            for d in _week_days(week):
+                # One contiguous window: once started or ended, it stays so
+                for h in hours:
+                    if h + 1 < len(hours):
+                        solver.add(Implies(started[e][d][h], started[e][d][h + 1]),
+                                   Implies(ended[e][d][h], ended[e][d][h + 1]))
+                    solver.add(Implies(ended[e][d][h], started[e][d][h]),
+                               present[e][d][h] == And(started[e][d][h], Not(ended[e][d][h])))
+                # The window is as long as the shift, and there is one only on working days
+                solver.add(started[e][d][-1] == Or(*shift[e][d].values()))
+                solver.add(PbEq([(x, 1) for x in present[e][d]] + [(x, -length) for length, x in shift[e][d].items()], 0))
+
+            for family in WINDOW_RULES:
+                for key, constraint in family(rules, shift, e, week):
+                    add(key, constraint)
+            for family in WINDOW_TIME_RULES:
+                for key, constraint in family(rules, (started, ended), e, week):
+                    add(key, constraint)
+        for key, constraint in hourly_coverage_rules(rules, present, week):
+            add(key, constraint)
+
+    # Employees that can swap rosters start their first day in the order they are listed
+    # (not when rules are tracked: switching off the rules of one of them breaks the symmetry)
+    for group in interchangeable(rules) if tracked is None else ():
+        for e, f in zip(group, group[1:]):
+            for h in hours:
+                solver.add(Implies(started[e][0][h], started[f][0][h]))
+
+    def read(model):
+        windows = {}
+        for e in rules["staff"]:
+            windows[e] = []
+            for d in days:
+                at = [h for h in hours if is_true(model.evaluate(present[e][d][h]))]
+                windows[e].append((opening + at[0], opening + at[-1] + 1) if at else None)
+        return windows
+
+    return read
+
+
+def window_hours(windows):
+    """Hours worked by every employee on every day of a roster of shift windows."""
+    return {e: [0 if window is None else window[1] - window[0] for window in days] for e, days in windows.items()}
+
+
+def check_windows(windows, rules):
+    """
+    Checks a roster of shift windows against the rules.
+
+    Args:
+        windows (dict): (start, end) of every employee on every day, None on days off.
+        rules (dict): The rules, see load_rules().
+
+    Returns:
+        bool: True if the roster respects every rule.
+    """
+    if not check_roster(window_hours(windows), rules):
+        return False
+    opening, closing = rules["opening"], rules["closing"]
+    days = rules["weeks"] * DAYS_PER_WEEK
+    shifts = [window for e in rules["staff"] for window in windows[e] if window is not None]
+    if any(start < opening or end > closing for start, end in shifts):
+        return False
+    for e, person in rules["staff"].items():
+        for week in range(rules["weeks"]):
+            week_windows = windows[e][week * DAYS_PER_WEEK: (week + 1) * DAYS_PER_WEEK]
+            late = sum(w is not None and w[0] <= rules["late_shift_start"] and w[1] == closing
+                       for w in week_windows[:5])
+            if late < person["late_shift_days"]:
+                return False
+            early = sum(w is None or w[1] <= rules["early_shift_end"] for w in week_windows)
+            if early < person["early_shift_days"]:
+                return False
+            if any(windows[e][d] is not None and windows[e][d][1] > opening + limit
+                   for name in person["games"] for d, limit in _game_days(rules, name, week).items()):
+                return False
+    for store, coverage in rules["stores"].items():
+        members = [e for e, person in rules["staff"].items() if person["store"] == store]
+        per_hour = -(-coverage // (closing - opening))
+        if not all(sum(windows[e][d] is not None and windows[e][d][0] <= hour < windows[e][d][1] for e in members)
+                   >= per_hour for d in range(days) for hour in range(opening, closing)):
+            return False
+    return True
+
+
+def is_valid_windows(windows, staff, weeks, coverage=SHIFT_HOURS):
+    """
+    Checks a roster of shift windows against every rule.
+
+    Args:
+        windows (dict): (start, end) of every employee on every day, None on days off.
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+
+    Returns:
+        bool: True if the roster respects every rule.
+    """
+    return check_windows(windows, default_rules(staff, weeks, coverage))
+
+
+def solve_windows(staff=STAFF, weeks=4, coverage=SHIFT_HOURS, timeout_ms=None, rules=None):
+    """
+    Finds a roster of shift windows that respects every rule, covering every opening hour.
+
+    Args:
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day, so coverage / SHIFT_HOURS employees in every hour.
+        timeout_ms (int): Optional timeout of the solver in milliseconds.
+        rules (dict): Optional rules replacing staff, weeks and coverage, see load_rules().
+
+    Returns:
+        dict: The (start, end) of every employee on every day, None on days off.
+        None: If there is no roster (or none was found in time).
+    """
+    solver = Solver()
+    if timeout_ms is not None:
+        solver.set("timeout", timeout_ms)
+    read = build_window_rules_model(solver, rules if rules is not None else default_rules(staff, weeks, coverage))
+    if solver.check() != sat:
+        return None
+    return read(solver.model())
+
+
+def _minimize_core(solver, core):
+    """
+    Shrinks an unsat core until dropping any literal makes it satisfiable (deletion-based),
+    reusing the core of every unsat check to drop many literals at once.
+    """
+    core = list(core)
+    i = 0
+    while i < len(core):
+        trial = core[:i] + core[i + 1:]
+        if solver.check(*trial) == unsat:
+            # The literals before i are needed by every core of the trial, so they stay
+            smaller = {literal.get_id() for literal in solver.unsat_core()}
+            core = [literal for literal in trial if literal.get_id() in smaller]
+        else:
+            # Satisfiable (or undecided in time): the literal stays in the core
+            i += 1
+    return core
+
+
+def _correction_set(solver, tracked):
+    """
+    Finds a minimal correction set: rule instances that, switched off, leave the others
+    satisfiable, and each of which is needed. Grows a satisfiable set of rules in the
+    order of FAMILIES, adding at once every rule the last model already satisfies.
+    """
+    keys = sorted(tracked, key=lambda key: FAMILIES.index(key[0]) if key[0] in FAMILIES else len(FAMILIES))
+    kept, relax = [], []
+
+    def satisfied(model):
+        return {key for key in keys if is_true(model.evaluate(And(tracked[key][1]), model_completion=True))}
+
+    if solver.check() != sat:
+        return None
+    holds = satisfied(solver.model())
+    for key in keys:
+        if key in holds:
+            kept.append(key)
+            continue
+        result = solver.check(*[tracked[k][0] for k in kept + [key]])
+        if result == sat:
+            kept.append(key)
+            # The new model satisfies every kept rule, the older ones may not
+            holds = satisfied(solver.model())
+        else:
+            relax.append(key)
+    return relax
+
+
+def diagnose(staff=STAFF, weeks=4, coverage=SHIFT_HOURS, engine="boolean", timeout_ms=10000, rules=None):
+    """
+    Explains why a roster is infeasible.
+
+    Every rule instance (family, employee, week or day) is added behind its own Bool
+    and switched on by assumptions, so one incremental solver answers every question.
+
+    Args:
+        staff (dict): Contract of every employee, keys of CONTRACTS.
+        weeks (int): Number of weeks of the roster.
+        coverage (int): Hours to cover every day.
+        engine (str): "boolean" for hours per day or "window" for shift windows.
+        timeout_ms (int): Timeout of every check in milliseconds.
+        rules (dict): Optional rules replacing staff, weeks and coverage, see load_rules().
+
+    Returns:
+        dict: "status", "feasible" if a roster exists, "unknown" if the check ran out of time,
+            or "infeasible" with "core", rule instances that cannot hold together, none of
+            which can be dropped, and "relax", rule instances whose removal makes the roster
+            feasible, chosen among the families at the end of FAMILIES first (preferences
+            before contract rules).
+    """
+    solver = Solver()
+    solver.set("timeout", timeout_ms)
+    tracked = {}
+    if rules is None:
+        rules = default_rules(staff, weeks, coverage)
+    build = build_window_rules_model if engine == "window" else build_rules_model
+    build(solver, rules, tracked)
+    by_literal = {literal.get_id(): key for key, (literal, _) in tracked.items()}
+
+    result = solver.check(*[literal for literal, _ in tracked.values()])
+    if result == sat:
+        return {"status": "feasible"}
+    if result != unsat:
+        return {"status": "unknown"}
+    core = _minimize_core(solver, solver.unsat_core())
+    return {"status": "infeasible", "core": [by_literal[literal.get_id()] for literal in core],
+            "relax": _correction_set(solver, tracked)}
+
+
+class RosterSession:
+    """
+    Keeps a roster model alive while the planners edit it and the horizon rolls forward.
+
+    The rules are those of build_rules_model(), every week of an employee and the
+    coverage of every week defined behind literals passed to the solver as assumptions.
+    An edit encodes again only the week it touches under new literals and the old ones
+    are no longer assumed, so the clauses learned on the rest of the model are kept,
+    and every solve starts from the previous roster. Days are counted from the first
+    day of the first week.
+
+    The rules no longer assumed (edited or retired) stay in the solver, so once they
+    outnumber the live ones the solver is built again from the rules and the retired
+    days that still count: its size stays within about twice the horizon.
+    """
+
+    def __init__(self, staff=STAFF, weeks=4, coverage=SHIFT_HOURS, rules=None):
+        """
+        Args:
+            staff (dict): Contract of every employee, keys of CONTRACTS.
+            weeks (int): Number of weeks of the horizon.
+            coverage (int): Hours to cover every day.
+            rules (dict): Optional rules replacing staff, weeks and coverage, see load_rules().
+        """
+        self.rules = copy.deepcopy(rules) if rules is not None else default_rules(staff, weeks, coverage)
+        self.weeks = self.rules["weeks"]
+        self.first_week = 0
+        self.roster = None
+        self._solved = False  # The roster respects the current edits
+
+        self._frozen = {}  # Retired day -> hours worked by every employee
+        self._build()
+
+    def _build(self):
+        """Builds the solver from the rules of the horizon and the retired days that still count."""
+        self.solver = Solver()
+        self._shift = {e: {} for e in self.rules["staff"]}  # e -> day -> shift length -> Bool
+        self._groups = {}  # Group -> (literals, last day of its rules)
+        self._dead = 0  # Groups no longer assumed whose rules are still in the solver
+        for week in sorted({d // DAYS_PER_WEEK for d in self._frozen}):
+            _add_boolean_week(self.solver, self.rules, self._shift, week)
+            for e in self._shift:
+                for d in _week_days(week):
+                    if d not in self._frozen:
+                        del self._shift[e][d]
+        for week in range(self.first_week, self.first_week + self.weeks):
+            self._add_week(week)
+
+    @property
+    def first_day(self):
+        return self.first_week * DAYS_PER_WEEK
+
+    @property
+    def end_day(self):
+        return (self.first_week + self.weeks) * DAYS_PER_WEEK
+
+    def _encode(self, group, week, constraints):
+        """Defines the constraints (key, constraint) behind new literals, replacing those of the group."""
+        tracked = {}
+        add = _adder(self.solver, tracked)
+        for key, constraint in constraints:
+            add(key, constraint)
+        self._dead += group in self._groups
+        self._groups[group] = ([literal for literal, _ in tracked.values()], _week_days(week)[-1])
+        self._solved = False
+
+    def _encode_employee(self, e, week):
+        self._encode(("employee", e, week), week,
+                     (rule for family in EMPLOYEE_RULES for rule in family(self.rules, self._shift, e, week)))
+
+    def _add_week(self, week):
+        """Adds the days of a week at the end of the horizon, with their rules."""
+        _add_boolean_week(self.solver, self.rules, self._shift, week)
+        for e in self.rules["staff"]:
+            self._encode_employee(e, week)
+        self._encode(("coverage", week), week, coverage_rules(self.rules, self._shift, week))
+
+    def _check_day(self, day):
+        if not self.first_day <= day < self.end_day:
+            raise ValueError(f"Day {day} is outside the horizon [{self.first_day}, {self.end_day})")
+
+    def add_game(self, day, kick_off, game="napoli"):
+        """
+        Adds a game, or moves the kick-off of the game of that day.
+
+        Args:
+            day (int): Day of the game.
+            kick_off (int): Hour of the kick-off.
+            game (str): Key of the games in the rules.
+        """
+        self._check_day(day)
+        self.rules["games"][game]["days"][day] = kick_off
+        for e, person in self.rules["staff"].items():
+            if game in person["games"]:
+                self._encode_employee(e, day // DAYS_PER_WEEK)
+
+    def add_sick_day(self, e, day):
+        """
+        Gives e the day off. In that week e works at most (not exactly) the weekly hours.
+
+        Args:
+            e (str): The employee.
+            day (int): The sick day.
+        """
+        self._check_day(day)
+        self.rules["staff"][e]["sick_days"].append(day)
+        self._encode_employee(e, day // DAYS_PER_WEEK)
+
+    def set_hours(self, e, week, hours):
+        """
+        Changes the weekly hours of e in one week, lifting the shift counts of the contract.
+
+        Args:
+            e (str): The employee.
+            week (int): Index of the week.
+            hours (int): Hours to work in that week.
+        """
+        self._check_day(week * DAYS_PER_WEEK)
+        self.rules["staff"][e]["weekly_hours"][week] = hours
+        self._encode_employee(e, week)
+
+    def roll(self, weeks=1):
+        """
+        Moves the horizon forward: the first weeks retire with the shifts of the last
+        roster, which still count for the consecutive days, and new weeks are added.
+        The last solve must have found a roster after the last edit.
+
+        Args:
+            weeks (int): Number of weeks to move forward.
+        """
+        if not self._solved:
+            raise ValueError("Solve the roster after the last edit before rolling the horizon")
+        longest = self.rules["max_consecutive_days"]
+        for _ in range(weeks):
+            for d in _week_days(self.first_week):
+                self._frozen[d] = {e: self.roster[e][d - self.first_day] for e in self._shift}
+            self.roster = {e: hours[DAYS_PER_WEEK:] for e, hours in self.roster.items()}
+            self.first_week += 1
+            self._add_week(self.first_week + self.weeks - 1)
+            # Forget the rules over retired days only, and the days no window reaches
+            live = {group: (literals, last) for group, (literals, last) in self._groups.items()
+                    if last >= self.first_day}
+            self._dead += len(self._groups) - len(live)
+            self._groups = live
+            for d in [d for d in self._frozen if d < self.first_day - longest]:
+                del self._frozen[d]
+                for e in self._shift:
+                    del self._shift[e][d]
+        # The roster of the new weeks is still to be found
+        self._solved = False
+
+    def solve(self, timeout_ms=None):
+        """
+        Finds a roster of the horizon for the current edits, starting from the previous one.
+
+        Args:
+            timeout_ms (int): Optional timeout of the solver in milliseconds.
+
+        Returns:
+            dict: The hours worked by every employee on every day of the horizon, from first_day.
+            None: If there is no roster (or none was found in time).
+        """
+        if self._dead > len(self._groups):
+            self._build()
+        if timeout_ms is not None:
+            self.solver.set("timeout", timeout_ms)
+        if self.roster is not None:
+            for e, hours in self.roster.items():
+                for d, worked in enumerate(hours, self.first_day):
+                    for length, x in self._shift[e][d].items():
+                        self.solver.set_initial_value(x, length == worked)
+        assumptions = [literal for literals, _ in self._groups.values() for literal in literals]
+        assumptions += [x if length == hours[e] else Not(x)
+                        for d, hours in self._frozen.items() for e in hours for length, x in self._shift[e][d].items()]
+        if self.solver.check(*assumptions) != sat:
+            self._solved = False
+            return None
+        self.roster = _read_hours(self.solver.model(), self._shift, range(self.first_day, self.end_day))
+        self._solved = True
+        return self.roster
+
+
+def print_diagnosis(report):
+    """Prints the result of diagnose()."""
+    if report["status"] == "feasible":
+        print("The rules can hold together, a roster exists.")
+        return
+    if report["status"] == "unknown":
+        print("The solver ran out of time before deciding whether the rules can hold together.")
+        return
+    print("These rules cannot hold together:")
+    for key in report["core"]:
+        print("  " + " / ".join(key))
+    if report["relax"] is not None:
+        print("Relax these rules to find a roster:")
+        for key in report["relax"]:
+            print("  " + " / ".join(key))
+
+
+# Example usage
+if __name__ == "__main__":
+    # A month of work: 4 weeks of 7 days, or the rules of a file: python workShifts.py workShifts.json
+    files = [arg for arg in sys.argv[1:] if arg.endswith(".json")]
+    rules = load_rules(files[0]) if files else default_rules(STAFF, weeks=4)
+    start_time = time.perf_counter()
+    if "windows" in sys.argv[1:]:
+        # Start and end of every shift: python workShifts.py windows
+        windows = solve_windows(rules=rules)
+        if windows is not None:
+            for e in rules["staff"]:
+                print(f"Schedule for {e}:")
+                for d, window in enumerate(windows[e]):
+                    print(f"Day {d + 1}: {window[0]}:00 - {window[1]}:00" if window else f"Day {d + 1}: off")
+        else:
+            print("No solution found.")
+            print_diagnosis(diagnose(engine="window", rules=rules))
+    else:
+        # Hours worked every day
+        roster = solve_roster(rules=rules)
+        if roster is not None:
+            for e in rules["staff"]:
+                print(f"Schedule for {e}:")
+                print(roster[e])
+        else:
+            print("No solution found.")
+            print_diagnosis(diagnose(rules=rules))
+    print(f"Solver execution time: {time.perf_counter() - start_time:.4f} seconds")
@@ -0,0 +1,264 @@
+"""""
+            ### Scheduling Problem, work shifts benchmark ###
+
+Compares the engines of workShifts.py on rosters of growing size, over
+a quarter (13 weeks) by default, measuring the time needed to build and
+solve the model and the peak memory of the process.
+
+The staff repeats the shop of workShifts.py (two part-time and two
+full-time employees, the first four keep their names and preferences)
+and every group of four employees covers the opening hours of one
+shop, so the roster stays as tight as the original one.
+
+Every case runs in a fresh process so that the peak memory of one
+engine does not leak into the next one.
+
+benchmark_chain() sweeps the rules of a chain of shops (build_rules_model
+over chain_rules()) from 10 to 200 employees and from 4 to 52 weeks,
+every shop with its own coverage, to show where the formulation stops
+scaling. A size that times out is not tried on the longer horizons.
+
+"""""
+
+import multiprocessing
+import resource
+import sys
+import time
+
+from z3 import Solver, sat, unknown
+
+from workShifts import (ENGINES, SHIFT_HOURS, STAFF, build_boolean_model, build_int_model, build_rules_model,
+                        build_window_model, check_roster, default_rules, is_valid_roster, is_valid_windows)
+
+
+def make_staff(n_employees):
+    """
+    Creates a staff of n_employees repeating the contracts of workShifts.STAFF.
+
+    Returns:
+        tuple: The contract of every employee and the hours to cover every day.
+    """
+    names = list(STAFF)
+    contracts = list(STAFF.values())
+    staff = {}
+    for i in range(n_employees):
+        name = names[i] if i < len(names) else f"E{i}"
+        staff[name] = contracts[i % len(contracts)]
+    return staff, SHIFT_HOURS * max(1, n_employees // len(contracts))
+
+
+def peak_memory_mb():
+    """Peak resident memory of the current process in megabytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_case(n_employees, weeks, engine, timeout_ms):
+    """Builds and solves one roster, returning its measurements."""
+    staff, coverage = make_staff(n_employees)
+    base_memory = peak_memory_mb()
+
+    start_time = time.perf_counter()
+    solver = Solver()
+    solver.set("timeout", timeout_ms)
+    build = build_int_model if engine == "int" else build_boolean_model
+    read = build(solver, staff, weeks, coverage)
+    build_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    result = solver.check()
+    solve_time = time.perf_counter() - start_time
+
+    status = "timeout" if result == unknown else str(result)
+    if result == sat and not is_valid_roster(read(solver.model()), staff, weeks, coverage):
+        status = "wrong"
+    return {
+        "employees": n_employees,
+        "weeks": weeks,
+        "engine": engine,
+        "build_s": build_time,
+        "solve_s": solve_time,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "status": status,
+    }
+
+
+def run_isolated(func, *args):
+    """Runs func(*args) in a fresh process and returns its result."""
+    with multiprocessing.Pool(1) as pool:
+        return pool.apply(func, args)
+
+
+def benchmark(sizes=(4, 20, 30, 40, 50), weeks=13, engines=ENGINES, timeout_ms=60000):
+    """
+    Runs every engine on every staff size.
+
+    Args:
+        sizes (tuple): Number of employees of the rosters.
+        weeks (int): Number of weeks of the rosters.
+        engines (tuple): Engines of workShifts.py to compare.
+        timeout_ms (int): Timeout of the solver for each case in milliseconds.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_employees in sizes:
+        for engine in engines:
+            row = run_isolated(_run_case, n_employees, weeks, engine, timeout_ms)
+            print(f"employees {row['employees']:<4} weeks {row['weeks']:<3} {row['engine']:<8} "
+                  f"build {row['build_s']:7.3f}s  solve {row['solve_s']:8.3f}s  "
+                  f"peak {row['peak_mb']:7.1f}MB  {row['status']}")
+            rows.append(row)
+    return rows
+
+
+def _run_windows(n_employees, weeks, timeout_ms):
+    """Builds and solves one roster of shift windows, returning its measurements."""
+    staff, coverage = make_staff(n_employees)
+    base_memory = peak_memory_mb()
+
+    start_time = time.perf_counter()
+    solver = Solver()
+    solver.set("timeout", timeout_ms)
+    read = build_window_model(solver, staff, weeks, coverage)
+    build_time = time.perf_counter() - start_time
+    n_constraints = len(solver.assertions())
+
+    start_time = time.perf_counter()
+    result = solver.check()
+    solve_time = time.perf_counter() - start_time
+
+    status = "timeout" if result == unknown else str(result)
+    if result == sat and not is_valid_windows(read(solver.model()), staff, weeks, coverage):
+        status = "wrong"
+    return {
+        "employees": n_employees,
+        "weeks": weeks,
+        "constraints": n_constraints,
+        "build_s": build_time,
+        "solve_s": solve_time,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "status": status,
+    }
+
+
+def benchmark_windows(sizes=(4, 10, 20, 30), weeks=(4, 13), timeout_ms=60000):
+    """
+    Runs the shift window mode of workShifts.py on growing staff and horizons.
+
+    Every case must come back sat with a roster that passes is_valid_windows(),
+    so the output doubles as a regression check of the mode.
+
+    Args:
+        sizes (tuple): Number of employees of the rosters.
+        weeks (tuple): Numbers of weeks of the rosters.
+        timeout_ms (int): Timeout of the solver for each case in milliseconds.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    for n_weeks in weeks:
+        for n_employees in sizes:
+            row = run_isolated(_run_windows, n_employees, n_weeks, timeout_ms)
+            print(f"employees {row['employees']:<4} weeks {row['weeks']:<3} constraints {row['constraints']:<7} "
+                  f"build {row['build_s']:7.3f}s  solve {row['solve_s']:8.3f}s  "
+                  f"peak {row['peak_mb']:7.1f}MB  {row['status']}")
+            rows.append(row)
+    return rows
+
+
+def chain_rules(n_employees, weeks, store_size=5):
+    """
+    The rules of a chain of shops with store_size employees each: the four of
+    workShifts.STAFF, with their preferences, and full-time ones without.
+    The last shop takes the employees left over.
+
+    Returns:
+        dict: The rules, see workShifts.load_rules().
+    """
+    shop = default_rules(STAFF)
+    roles = list(shop["staff"].values())
+    n_stores = max(1, n_employees // store_size)
+    rules = dict(shop, weeks=weeks, staff={},
+                 stores={f"shop{k + 1}": SHIFT_HOURS for k in range(n_stores)})
+    for i in range(n_employees):
+        store = min(i // store_size, n_stores - 1)
+        role = roles[i % store_size] if i % store_size < len(roles) else roles[2]
+        rules["staff"][f"E{i}"] = dict(role, store=f"shop{store + 1}")
+    return rules
+
+
+def _run_chain(n_employees, weeks, timeout_ms):
+    """Builds and solves the roster of a chain of shops, returning its measurements."""
+    rules = chain_rules(n_employees, weeks)
+    base_memory = peak_memory_mb()
+
+    start_time = time.perf_counter()
+    solver = Solver()
+    solver.set("timeout", timeout_ms)
+    read = build_rules_model(solver, rules)
+    build_time = time.perf_counter() - start_time
+    n_constraints = len(solver.assertions())
+
+    start_time = time.perf_counter()
+    result = solver.check()
+    solve_time = time.perf_counter() - start_time
+
+    status = "timeout" if result == unknown else str(result)
+    if result == sat and not check_roster(read(solver.model()), rules):
+        status = "wrong"
+    return {
+        "employees": n_employees,
+        "weeks": weeks,
+        "stores": len(rules["stores"]),
+        "constraints": n_constraints,
+        "build_s": build_time,
+        "solve_s": solve_time,
+        "peak_mb": peak_memory_mb() - base_memory,
+        "status": status,
+    }
+
+
+def benchmark_chain(sizes=(10, 25, 50, 100, 200), weeks=(4, 13, 26, 52), timeout_ms=60000):
+    """
+    Runs the rules of a chain of shops on growing staff and horizons.
+
+    Args:
+        sizes (tuple): Number of employees of the chain.
+        weeks (tuple): Numbers of weeks of the rosters.
+        timeout_ms (int): Timeout of the solver for each case in milliseconds.
+
+    Returns:
+        list: One dictionary of measurements for each case.
+    """
+    rows = []
+    given_up = set()
+    for n_weeks in weeks:
+        for n_employees in sizes:
+            if n_employees in given_up:
+                continue
+            row = run_isolated(_run_chain, n_employees, n_weeks, timeout_ms)
+            print(f"employees {row['employees']:<4} weeks {row['weeks']:<3} stores {row['stores']:<3} "
+                  f"constraints {row['constraints']:<8} build {row['build_s']:7.3f}s  solve {row['solve_s']:8.3f}s  "
+                  f"peak {row['peak_mb']:7.1f}MB  {row['status']}")
+            rows.append(row)
+            if row["status"] == "timeout":
+                given_up.update(n for n in sizes if n >= n_employees)
+    return rows
+
+
+# Example usage
+if __name__ == "__main__":
+    if "windows" in sys.argv[1:]:
+        # Shift windows with coverage hour by hour: python workShiftsTime.py windows
+        benchmark_windows()
+    elif "chain" in sys.argv[1:]:
+        # Rules of a chain of shops, 10 to 200 employees over 4 to 52 weeks: python workShiftsTime.py chain
+        benchmark_chain()
+    else:
+        # Timeout per case can be passed on the command line (in seconds)
+        timeout_s = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+        benchmark(timeout_ms=timeout_s * 1000)